@@ -1,5 +1,7 @@
-from supabase import create_client, Client
+from supabase import create_client, acreate_client, Client, AsyncClient
 from dotenv import load_dotenv
+from typing import Optional
+import asyncio
 import os
 
 load_dotenv()
@@ -9,7 +11,25 @@ key = os.getenv("SUPABASE_API_KEY")
 
 supabase: Client = create_client(url, key)
 
+# Async Client: 첫 요청 시 생성 후 재사용
+async_supabase: Optional[AsyncClient] = None
+_async_lock = asyncio.Lock()
+
 def connect_supabase():
     if not url or not key:
         raise ValueError("Supabase URL and Key must be set in environment variables.")
-    return supabase
\ No newline at end of file
+    return supabase
+
+async def connect_supabase_async() -> AsyncClient:
+    """ Non-blocking Supabase client (event loop를 막지 않음) """
+    global async_supabase
+
+    if not url or not key:
+        raise ValueError("Supabase URL and Key must be set in environment variables.")
+
+    if async_supabase is None:
+        async with _async_lock:
+            if async_supabase is None:
+                async_supabase = await acreate_client(url, key)
+
+    return async_supabase
@@ -1,67 +1,105 @@
 from langchain_ollama import OllamaLLM
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import CrossEncoderReranker
-from langchain_community.cross_encoders import HuggingFaceCrossEncoder
-from langchain.retrievers.document_compressors import DocumentCompressorPipeline
-from langchain.retrievers.document_compressors import EmbeddingsFilter
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from fastapi import FastAPI
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-from app.routers import llm, db, metrics
+from app.routers import llm, db, metrics, health, monitoring
+from app.services.model_runtime import ModelRuntimeConfig, configure_threads
+from app.services.model_registry import registry, get_embedding, get_cross_encoder
+from app.services.executor import get_model_executor, shutdown_model_executor
+from app.services.gemini import close_gemini_clients
+from app.services.reranker import BatchedCrossEncoderReranker
+from app.services.retrieval import EmbeddingReuseRetriever
+from app.services.lexical import LEXICAL_INDEX_ENABLED, HYBRID_FETCH_K, RRF_K, open_lexical_index
+from app.services.rag_chain import PromptLoader, build_rag_chain, build_generation_chain
+from app.services.answer_cache import SemanticAnswerCache, ANSWER_CACHE_ENABLED
+from app.services.history import HistoryManager
+from app.services.log_writer import ChatLogWriter
+from app.services.tracing import TRACING_ENABLED, TracingCallbackHandler, TracingMiddleware
+from app.dependency.db import connect_supabase_async
 from pathlib import Path
+import asyncio
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """ Server Start >> LLM, Embedding, Vectorstore memory load """
-    # Definition LLM, Embedding, Vectorstore
-    llm = OllamaLLM(
-        model = 'gpt-oss:20b',
-        temperature = 0.1
-    )
+# 서빙에 필요한 모델 (readiness 기준)
+REQUIRED_MODELS = ['llm', 'embedding', 'vectorstore', 'cross_encoder', 'rag_chain']
 
-    embedding = HuggingFaceEmbeddings(
-        model_name = 'FronyAI/frony-embed-large-ko-v1',
-        model_kwargs = {'device': 'mps'},
-        encode_kwargs = {'normalize_embeddings': True}
-    )
+PERSIST_DIRECTORY = '/Users/dooohn/Project/ga_chatbot/ga_assistant_store'
 
-    vectorstore = Chroma(
-        embedding_function = embedding,
-        collection_name = 'ga_assistant',
-        persist_directory = '/Users/dooohn/Project/ga_chatbot/ga_assistant_store'
-    )
+async def warm_up(app: FastAPI):
+    """ LLM, Embedding(-> Vectorstore), Cross Encoder 병렬 로드 후 RAG Chain 조립 """
+    # Model Runtime: device(auto: cuda > mps > cpu), thread 수, backend(torch / onnx / int8)
+    runtime_config = ModelRuntimeConfig.from_env()
+    configure_threads(runtime_config.num_threads)
 
-    retriever = vectorstore.as_retriever(search_kwargs = {'k': 3})
+    # Definition LLM, Embedding, Vectorstore
+    def load_llm():
+        return OllamaLLM(
+            model = 'gpt-oss:20b',
+            temperature = 0.1
+        )
+
+    async def load_vectorstore():
+        embedding = await asyncio.to_thread(get_embedding)
+
+        return await registry.aload('vectorstore', lambda: Chroma(
+            embedding_function = embedding,
+            collection_name = 'ga_assistant',
+            persist_directory = PERSIST_DIRECTORY
+        ))
+
+    # Define Cross Encoder: metrics router와 같은 인스턴스 공유
+    llm, vectorstore, CrossEncoder = await asyncio.gather(
+        registry.aload('llm', load_llm),
+        load_vectorstore(),
+        asyncio.to_thread(get_cross_encoder)
+    )
+    embedding = registry.get('embedding')
 
-    # Define Cross Encoder
-    CrossEncoder = HuggingFaceCrossEncoder(model_name = 'BAAI/bge-reranker-v2-m3')
+    # Lexical Index: Chroma 와 같은 chunk 의 BM25 index (persist directory 에서 로드, 누락분만 동기화)
+    lexical_index = None
+    if LEXICAL_INDEX_ENABLED:
+        lexical_index = await asyncio.to_thread(open_lexical_index, PERSIST_DIRECTORY, vectorstore._collection)
 
-    # Re-rank Compressor
-    re_ranker = CrossEncoderReranker(
+    # Re-rank Compressor: 동시 요청의 pair를 micro-batch로 묶어 Bounded Executor에서 predict
+    re_ranker = BatchedCrossEncoderReranker(
     model = CrossEncoder,
-    top_n = 2
+    top_n = 2,
+    executor = get_model_executor()
     )
 
-    # EmbeddingsFilter
-    EmbeddingFilter = EmbeddingsFilter(
-    embeddings = embedding,
-    similarity_threshold = 0.3
+    # Final retriever: Query embedding 1회 계산 -> Chroma(k=3, 저장 벡터 포함) -> Re-rank -> Similarity filter(0.3)
+    # EmbeddingsFilter와 달리 query / 문서를 다시 임베딩하지 않음
+    # Hybrid: Dense / BM25 각 top HYBRID_FETCH_K -> RRF -> 상위 3개만 Re-rank
+    final_retriever = EmbeddingReuseRetriever(
+        vectorstore = vectorstore,
+        embedding = embedding,
+        k = 3,
+        re_ranker = re_ranker,
+        similarity_threshold = 0.3,
+        lexical_index = lexical_index,
+        fetch_k = HYBRID_FETCH_K,
+        rrf_k = RRF_K
     )
 
-    # Compressor Pipeline
-    compressor_pipeline = DocumentCompressorPipeline(
-        transformers= [re_ranker, EmbeddingFilter]
-    )
+    # RAG Chain: Prompt / Chain 1회 compile (Prompt는 파일 mtime 변경 시에만 reload)
+    prompt_loader = PromptLoader(Path.cwd() / 'prompt' / 'llm_context.txt')
+    prompt_loader.get()
 
-    # Final retriever
-    final_retriever = ContextualCompressionRetriever(
-        base_compressor = compressor_pipeline,
-        base_retriever = retriever
-    )
+    rag_chain = build_rag_chain(llm, final_retriever, prompt_loader)
+    generation_chain = build_generation_chain(llm, prompt_loader)
+
+    # Tracing: LLM 호출 시간 / 첫 토큰 / 토큰 수 (비활성화 시 callback 미등록)
+    if TRACING_ENABLED:
+        callbacks = [TracingCallbackHandler()]
+        rag_chain = rag_chain.with_config(callbacks = callbacks)
+        generation_chain = generation_chain.with_config(callbacks = callbacks)
+
+    # Semantic Answer Cache: 유사 질문 + 동일 검색 문서 -> 저장된 답변 재사용
+    answer_cache = SemanticAnswerCache() if ANSWER_CACHE_ENABLED else None
+
+    # Chat History: token budget + conversation 별 rolling summary (background LLM 요약)
+    history_manager = HistoryManager(llm = llm, embedding = embedding)
 
     print("Resource Load Success.")
 
@@ -70,16 +108,60 @@ async def lifespan(app: FastAPI):
     app.state.embedding = embedding
     app.state.vectorstore = vectorstore
     app.state.retriever = final_retriever
+    app.state.lexical_index = lexical_index
+    app.state.re_ranker = re_ranker
+    app.state.prompt_loader = prompt_loader
+    app.state.rag_chain = rag_chain
+    app.state.generation_chain = generation_chain
+    app.state.answer_cache = answer_cache
+    app.state.history_manager = history_manager
+
+    # app.state 주입 완료 후 ready 표시
+    registry.set('rag_chain', rag_chain)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """ Server Start >> 모델 병렬 로드 (background), 준비 상태는 /health/ready 로 확인 """
+    for name in REQUIRED_MODELS:
+        registry.register(name)
+
+    app.state.required_models = REQUIRED_MODELS
+    warmup_task = asyncio.create_task(warm_up(app))
+
+    # Chat Log Writer: /db/insert_row 로그를 모아서 bulk insert
+    log_writer = ChatLogWriter(connect_supabase_async)
+    await log_writer.start()
+    app.state.log_writer = log_writer
 
     yield
     print("Server Down.")
-    del llm, embedding, vectorstore
+
+    await log_writer.stop()
+
+    if not warmup_task.done():
+        warmup_task.cancel()
+
+    re_ranker = getattr(app.state, 're_ranker', None)
+    if re_ranker is not None:
+        await re_ranker.aclose()
+
+    history_manager = getattr(app.state, 'history_manager', None)
+    if history_manager is not None:
+        await history_manager.aclose()
+
+    shutdown_model_executor()
+    await asyncio.to_thread(close_gemini_clients)
 
 app = FastAPI(lifespan = lifespan)
 
+# 요청별 stage 시간 기록 (/metrics, 선택적 Server-Timing header)
+app.add_middleware(TracingMiddleware)
+
 app.include_router(llm.router)      # LLM 관련 라우터
 app.include_router(db.router)       # DB 관련 라우터
 app.include_router(metrics.router)  # Metrics 관련 라우터
+app.include_router(health.router)   # Readiness 관련 라우터
+app.include_router(monitoring.router)   # Prometheus 관련 라우터
 
 # 정적 파일 디렉토리 마운트 -> 아이콘 이미지 Load
 app.mount("/images", StaticFiles(directory="images"), name="images")
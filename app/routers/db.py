@@ -1,7 +1,5 @@
-from ..dependency.db import connect_supabase
 from fastapi import Depends, Request, APIRouter
 from pydantic import BaseModel
-from supabase import Client
 
 router = APIRouter(
     prefix = "/db",         # 웹 페이지 path
@@ -23,11 +21,13 @@ async def get_ip(request: Request):
         return request.client.host
 
 @router.post('/insert_row', summary = "request & insert chatting log", tags = ['Supabase'])
-async def request(data: user_input, user_ip: str = Depends(get_ip), db: Client = Depends(connect_supabase)):
+async def request(request: Request, data: user_input, user_ip: str = Depends(get_ip)):
     """
     [pydantic class: data]
     - user_input: LLM에 유저가 요청한 쿼리
     - chat_response: 유저가 요청한 쿼리에 대한 답변
+
+    로그는 background writer 큐에 적재 후 bulk insert (응답 지연이 DB에 의존하지 않음)
     """
     # Insert Input Log
     insert_data = {
@@ -36,8 +36,11 @@ async def request(data: user_input, user_ip: str = Depends(get_ip), db: Client =
         'content': data.input_text,
         'response': data.chat_response
     }
-    try:
-        resopnse = db.from_('chat_logs').insert(insert_data).execute()
-        return print("[Row Insert] Success.")
-    except Exception as e:
-        return print(f"[Row Insert] Error: {e}")
\ No newline at end of file
+
+    queued = request.app.state.log_writer.enqueue(insert_data)
+
+    return {'status': 'queued' if queued else 'spilled'}
+
+@router.get('/log_writer/stats', summary = "Chat log writer flush metrics")
+async def log_writer_stats(request: Request) -> dict:
+    return request.app.state.log_writer.stats()
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from ..services.model_registry import registry
+
+router = APIRouter(
+    prefix = "/health",     # 웹 페이지 path
+    tags = ['Health']       # API docs에 표시될 태그
+)
+
+def require_ready(request: Request):
+    """ Dependency: 필수 모델 로드 전 요청은 503 반환 """
+    if not registry.is_ready(request.app.state.required_models):
+        raise HTTPException(status_code = 503, detail = "Models are loading", headers = {'Retry-After': '5'})
+
+@router.get('/live', summary = "Liveness")
+async def live():
+    return {'status': 'ok'}
+
+@router.get('/ready', summary = "Readiness: 모델별 로드 상태 / 소요 시간")
+async def ready(request: Request) -> JSONResponse:
+    """
+    - status: pending | lazy | loading | loaded | failed
+    - load_time: 로드 소요 시간 (초)
+    - 필수 모델이 모두 로드되기 전에는 503
+    """
+    is_ready = registry.is_ready(request.app.state.required_models)
+
+    return JSONResponse(
+        status_code = 200 if is_ready else 503,
+        content = {'ready': is_ready, 'models': registry.status()}
+    )
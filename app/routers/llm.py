@@ -1,16 +1,16 @@
 from pydantic import BaseModel, field_validator
 from dotenv import load_dotenv
 from pathlib import Path
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi import APIRouter, Depends, Query, Request
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableLambda, RunnablePassthrough
-from langchain_core.output_parsers import StrOutputParser
-from langchain_google_genai import ChatGoogleGenerativeAI
-from ..dependency.db import connect_supabase
-from supabase import Client
+from ..dependency.db import connect_supabase_async
+from .health import require_ready
+from ..services.rag_chain import format_docs
+from ..services.gemini import GeminiError, get_gemini_client
+from ..services.tracing import record_tokens, stage
+from supabase import AsyncClient
 from typing import List, Dict, Any, Optional, Union
-import time, json, os, gc
+import json, os
 
 # 라우터 객체 설정
 router = APIRouter(
@@ -22,104 +22,165 @@ router = APIRouter(
 load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
-# Root path
-root_path = Path.cwd()
-
 # Pydantic
 class ChatRequest(BaseModel):
     """ Validation User input """
     input_text: str                  # User Input Text
     history: Optional[Any] = None    # receive json from javascript
+    conversation_id: Optional[str] = None    # rolling summary cache key
 
 @router.get('/gemini', summary = 'Request Gemini Model')
-def request_gemini(input_text: str, model: str = 'gemini-2.5-flash', api_key = GEMINI_API_KEY, request_delay = None):
-
-    # Definition model object
-    llm = ChatGoogleGenerativeAI(
-        model = model,              # model name
-        google_api_key = api_key,   # API KEY
-        temperature = 0.5,
-        max_output_tokens = 2048
-    )
-
-    if request_delay is not None:
-        time.sleep(request_delay)
+async def request_gemini(input_text: str, model: str = 'gemini-2.5-flash', api_key: Optional[str] = None, stream: bool = False):
+    """
+    공유 Gemini Client 사용 (모델 설정 / connection pool 재사용)
+    - 동시 요청 수, RPM / TPM 제한은 client 에서 처리 (GEMINI_MAX_CONCURRENCY, GEMINI_RPM, GEMINI_TPM)
+    - stream = True : 생성되는 대로 text 전송
+    """
+    client = get_gemini_client(api_key or GEMINI_API_KEY)
+
+    if stream:
+        return StreamingResponse(
+            client.astream(input_text, model = model, temperature = 0.5, max_tokens = 2048),
+            media_type = 'text/plain; charset=utf-8'
+        )
 
-    return llm.invoke(input_text)
-
-def format_docs(docs):
-    """ Merge List in string """
-    return '\n\n'.join([doc.page_content for doc in docs])
-
-@router.post('/rag_model/lcel', summary = 'Request RAG Model apply LCEL')
-def request_rag_lcel(request: Request, chat_request: ChatRequest, model: str = 'gpt-oss:20b', db: Client = Depends(connect_supabase)) -> PlainTextResponse:
-    """ LCEL이 적용된 Ollama RAG 모델 """
+    try:
+        content = await client.agenerate(input_text, model = model, temperature = 0.5, max_tokens = 2048)
+    except GeminiError as e:
+        return JSONResponse(status_code = e.status_code, content = {'detail': str(e)})
+
+    return {'model': model, 'content': content}
+
+async def prepare_generation(request: Request, chat_request: ChatRequest) -> dict:
+    """
+    Retrieval -> History (token budget) -> Semantic Answer Cache 조회
+    - return: {'inputs': generation chain 입력, 'cached': 캐시된 답변 or None, 'cache_key': 저장용 key or None, 'headers': 토큰 수}
+    """
+    state = request.app.state
+    answer_cache = state.answer_cache
     input_text = chat_request.input_text
-    history = chat_request.history
 
-    # 1. Dependency injection: llm, embedding, vectorstore
-    llm = request.app.state.llm
-    retriever = request.app.state.retriever
+    # query embedding은 retriever에서 1회 계산 후 history 관련도 / 캐시 조회에 재사용
+    with stage('retrieval'):
+        docs, query_vector = await state.retriever.aretrieve(input_text)
+
+    with stage('history'):
+        history = await state.history_manager.abuild(chat_request.history, chat_request.conversation_id, query_vector)
+
+    inputs = {
+        'history_context': history.text,
+        'context': format_docs(docs),
+        'user_input': input_text
+    }
+
+    # prefill 비용 관찰용 prompt 토큰 수
+    with stage('prompt_build'):
+        prompt_tokens = state.history_manager.count(state.prompt_loader.format(inputs).to_string())
+    state.history_manager.record_prompt(prompt_tokens)
+    record_tokens('prompt', prompt_tokens)
+    record_tokens('history', history.tokens)
+
+    headers = {
+        'X-Prompt-Tokens': str(prompt_tokens),
+        'X-History-Tokens': str(history.tokens),
+        'X-History-Turns': f"{history.verbatim_turns}/{history.summarized_turns}/{history.dropped_turns}"
+    }
+
+    # 대화 히스토리가 있는 경우 답변이 문맥에 의존하므로 캐시 미사용
+    if answer_cache is None or history.text:
+        return {'inputs': inputs, 'cached': None, 'cache_key': None, 'headers': headers}
+
+    with stage('cache_lookup'):
+        answer_cache.check_collection(state.vectorstore)
+
+        doc_ids = [doc.metadata.get('doc_id', '') for doc in docs]
+        cached = answer_cache.lookup(query_vector, doc_ids)
+
+    return {'inputs': inputs, 'cached': cached, 'cache_key': (query_vector, doc_ids), 'headers': headers}
+
+@router.post('/rag_model/lcel', summary = 'Request RAG Model apply LCEL', dependencies = [Depends(require_ready)])
+async def request_rag_lcel(request: Request, chat_request: ChatRequest, model: str = 'gpt-oss:20b', db: AsyncClient = Depends(connect_supabase_async)) -> PlainTextResponse:
+    """ LCEL이 적용된 Ollama RAG 모델 (asyncio: 생성 대기 중 스레드를 점유하지 않음) """
+    # 1. Retrieval & Chat History (token budget) & Semantic Cache
+    prepared = await prepare_generation(request, chat_request)
+
+    if prepared['cached'] is not None:
+        return PlainTextResponse(content=prepared['cached'], media_type="text/plain", headers=prepared['headers'])
+
+    # 2. Generation: Chain (lifespan에서 1회 생성)
+    generation_chain = request.app.state.generation_chain
+
+    response = await generation_chain.ainvoke(prepared['inputs'])
+
+    if prepared['cache_key'] is not None:
+        request.app.state.answer_cache.store(*prepared['cache_key'], response)
+
+    return PlainTextResponse(content=response, media_type="text/plain", headers=prepared['headers'])
+
+@router.post('/rag_model/lcel/stream', summary = 'Request RAG Model apply LCEL (Token Streaming)', dependencies = [Depends(require_ready)])
+async def request_rag_lcel_stream(request: Request, chat_request: ChatRequest, model: str = 'gpt-oss:20b') -> StreamingResponse:
+    """
+    LCEL이 적용된 Ollama RAG 모델 - 토큰 스트리밍
+    - 동일한 retriever -> prompt -> llm 체인을 '.astream()'으로 실행
+    - 생성된 토큰을 chunked text/plain 으로 즉시 전송 (Time-to-first-token = 검색 시간)
+    """
+    prepared = await prepare_generation(request, chat_request)
+
+    generation_chain = request.app.state.generation_chain
+    answer_cache = request.app.state.answer_cache
+
+    async def token_generator():
+        """ Yield token chunks from the chain """
+        if prepared['cached'] is not None:
+            yield prepared['cached']
+            return
+
+        chunks = []
+        try:
+            async for chunk in generation_chain.astream(prepared['inputs']):
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception as e:
+            print(f"[Stream] Error: {e}")
+            return
+
+        if prepared['cache_key'] is not None:
+            answer_cache.store(*prepared['cache_key'], ''.join(chunks))
+
+    return StreamingResponse(
+        token_generator(),
+        media_type = "text/plain; charset=utf-8",
+        headers = {
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Proxy(nginx) buffering 비활성화
+            **prepared['headers']
+        }
+    )
 
-    # 2. Load Prompt text -> loaded_prompt: str
-    loaded_prompt = ""
+@router.get('/cache/stats', summary = 'Semantic Answer Cache hit / miss / near-miss counters')
+async def answer_cache_stats(request: Request) -> dict:
+    answer_cache = request.app.state.answer_cache
 
-    try:
-        file_path = root_path / 'prompt' / 'llm_context.txt'
-        with open(file_path, 'r', encoding = 'utf-8') as f:
-            loaded_prompt = f.read()    # Load Prompt Text
+    if answer_cache is None:
+        return {'enabled': False}
 
-    except FileNotFoundError:
-        print(f"Error: {file_path} not found")
+    return {'enabled': True, **answer_cache.stats()}
 
-    except Exception as e:
-        print(f"Error: {e}")
+@router.post('/cache/invalidate', summary = 'Clear Semantic Answer Cache')
+async def answer_cache_invalidate(request: Request) -> dict:
+    answer_cache = request.app.state.answer_cache
 
-    # 3. Load Chat History -> history_context: str
-    history_context = ""
+    if answer_cache is not None:
+        answer_cache.invalidate()
 
-    try:
-        if history and len(history) > 0:
-            print(f"Load history: {len(history)}EA")
-
-            history_context = "\n\n[Previous Conversation History]\n"
-            # 최근 5개 대화만 사용
-            for conv in history[-5:]:
-                history_context += f"USER: {conv.get('user', '')}\n"
-                history_context += f"AI Response: {conv.get('assistant', '')}\n\n"
-        else:
-            print("history is None")
-            
-    except json.JSONDecodeError:
-        print(f"Failed parse history, execute empty history")
-
-    # 4. Create Prompt
-    prompt_text = loaded_prompt   # Variable name: history_context, context, user_input
-
-    prompt = ChatPromptTemplate.from_template(prompt_text)
-
-    # 5. Retriever Chaining
-    def get_input_string(x):
-        """ If input type is dictionary """
-        return x['input_text'] if isinstance(x, dict) else x
-    
-    retriever_chain = RunnableLambda(get_input_string) | retriever | format_docs
-
-    # 6. Chaining RAG
-    rag_chain = (
-        # key: llm_context.txt variables, value: value
-        {
-            'history_context': RunnableLambda(lambda x: history_context),
-            'context': retriever_chain,
-            'user_input': RunnablePassthrough()
-        }
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
+    return {'enabled': answer_cache is not None}
 
-    response = rag_chain.invoke({'input_text': input_text})
+@router.get('/history/stats', summary = 'History token budget / prompt token counters')
+async def history_stats(request: Request) -> dict:
+    history_manager = getattr(request.app.state, 'history_manager', None)
 
-    gc.collect()
+    if history_manager is None:
+        return {'ready': False}
 
-    return PlainTextResponse(content=response, media_type="text/plain")
+    return {'ready': True, **history_manager.stats()}
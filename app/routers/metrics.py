@@ -1,13 +1,15 @@
-import time
+import asyncio
 import pandas as pd
 from typing import List, Dict
 from dotenv import load_dotenv
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, model_validator
 from langchain.evaluation import load_evaluator, EvaluatorType, EmbeddingDistance
 from langchain_core.documents import Document
 from langchain_openai import ChatOpenAI
-from sentence_transformers import CrossEncoder
-from korouge_score import rouge_scorer
+from ..services.model_registry import registry, get_cross_encoder
+from ..services.evaluation import EvaluationRunner, evaluate
+from ..services import scoring
 
 load_dotenv()
 
@@ -16,83 +18,78 @@ router = APIRouter(
     tags = ['Metrics']      # API docs에 표시될 태그
 )
 
-# Evaluator Object
-embedding_evaluator = load_evaluator(
-    evaluator = EvaluatorType.EMBEDDING_DISTANCE,               # 임베딩 거리 기반 평가
-    distance_metric = EmbeddingDistance.COSINE,                 # 거리 측정 : 코사인 거리 기반
-    llm = ChatOpenAI(model = 'gpt-4o-mini', temperature = 0.3)  # 추론에 사용될 LLM
-)
+class ScorePairs(BaseModel):
+    labels: List[str]
+    predicts: List[str]
+
+    @model_validator(mode = 'after')
+    def check_length(self):
+        if len(self.labels) != len(self.predicts):
+            raise ValueError('labels and predicts must have the same length')
+        return self
+
+# Evaluator / Cross Encoder: import 시점이 아닌 최초 사용 시 로드
+registry.register('embedding_evaluator', lazy = True)
 
-# Cross Encoder Model
-cross_encoder = CrossEncoder('BAAI/bge-reranker-v2-m3')
+def get_embedding_evaluator():
+    """ Embedding Distance Evaluator (lazy load) """
+    return registry.load('embedding_evaluator', lambda: load_evaluator(
+        evaluator = EvaluatorType.EMBEDDING_DISTANCE,               # 임베딩 거리 기반 평가
+        distance_metric = EmbeddingDistance.COSINE,                 # 거리 측정 : 코사인 거리 기반
+        llm = ChatOpenAI(model = 'gpt-4o-mini', temperature = 0.3)  # 추론에 사용될 LLM
+    ))
 
 @router.post('/single_mrr', summary = "Calculate MRR about single label")
 def single_mrr(label: Document, predict: List[Document]) -> float:
-    rank = 1
-
-    # Search rank
-    for doc in predict:
-        if doc.page_content == label.page_content:
-            return 1 / rank
-        
-        rank += 1
-    
-    # If no label, return 0.0
-    return 0.0
+    # doc_id (없으면 page_content hash) 기준으로 순위 탐색, 없으면 0.0
+    return float(scoring.document_mrr_scores([label], [predict])[0])
 
 @router.post('/mrrs_mean', summary = "Calculate MRR about multi label")
 def mrrs_mean(labels: List[Document], predicts: List[List[Document]]) -> float:
-    max_range = len(labels)
-    
-    mrrs = []
-    
-    for i in range(0, max_range):
-        label = labels[i]
-        predict = predicts[i]
-
-        mrr = single_mrr(label = label, predict = predict)
-        mrrs.append(mrr)
+    mrrs = scoring.document_mrr_scores(labels, predicts)
 
-    mrr_mean = sum(mrrs) / len(mrrs)
+    mrr_mean = float(mrrs.mean())
 
     return mrr_mean
 
+@router.post('/mrr/batch', summary = "Calculate MRR about multi label (per item)")
+def mrr_batch(labels: List[Document], predicts: List[List[Document]]) -> dict:
+    if len(labels) != len(predicts):
+        raise HTTPException(status_code = 422, detail = 'labels and predicts must have the same length')
+
+    mrrs = scoring.document_mrr_scores(labels, predicts)
+
+    return {'scores': mrrs.tolist(), 'mean': float(mrrs.mean()) if len(mrrs) else 0.0}
+
 @router.get('/embedding_distance', summary = 'Embedding Evaluator: COSINE Distance')
-async def evaluate_embedding(df, query_col: str, label_col: str, chain, time_delay = None) -> dict:
+async def evaluate_embedding(df, query_col: str, label_col: str, chain, time_delay = None, max_concurrency: int = 4, tpm = None, checkpoint_path = None) -> dict:
     """
     설명: Query(feature), Label이 있는 데이터프레임을 읽어 모델에 Query를 입력 후 생성한 답변을 평가
 
     - df : Pandas DataFrame
     - query_col : 쿼리가 저장된 컬럼
     - label_col : 쿼리에 대한 정답이 담긴 컬럼
-    - evaluator : 평가 객체
     - chain : RAG Chain
+    - time_delay : 요청 간 최소 간격(초), RPM 제한으로 변환 (60 / time_delay)
+    - max_concurrency : 동시에 실행되는 chain 호출 수
+    - tpm : 분당 토큰 제한
+    - checkpoint_path : 완료된 예측 저장 위치 (재실행 시 이어서 진행)
     """
+    runner = EvaluationRunner(
+        chain = chain,
+        checkpoint_path = checkpoint_path,
+        max_concurrency = max_concurrency,
+        rpm = 60 / time_delay if time_delay else None,
+        tpm = tpm
+    )
+
+    evaluator = await asyncio.to_thread(get_embedding_evaluator)
+
+    # Prediction(병렬) -> Embedding Distance(1 pass, 기존 evaluator와 같은 임베딩 모델)
+    result = await evaluate(df, query_col, label_col, runner, embedding = evaluator.embeddings, rouge_types = None)
+
+    scores = [0.0 if score == 0.0 else float(score) for score in result['scores']['embedding_distance'].fillna(0.0)]
 
-    scores = []
-
-    for i in range(len(df)):
-        # Extract query & label
-        query = df.iloc[i][query_col]
-        label = df.iloc[i][label_col]
-
-        # Execute prediction
-        predict = chain.invoke(query)
-
-        # Calculate score
-        score = embedding_evaluator.evaluate_strings(prediction = predict, reference = label)
-        extracted_score = round(score['score'], 5)
-        
-        # Floating point processing
-        if extracted_score == 0.0:
-            extracted_score = 0.0
-
-        scores.append(extracted_score)
-        
-        # API TPM Limit
-        if time_delay is not None:
-            time.sleep(time_delay)
-    
     scores_dict = {'score': scores}
 
     return scores_dict
@@ -100,13 +97,21 @@ async def evaluate_embedding(df, query_col: str, label_col: str, chain, time_del
 @router.get('/cross_encoder', summary = 'Evaluate Cross Encoder')
 async def evaluate_cross_encoder(label: str, predict: str):
     """ Calculate cross encoder similarity score in Single Text """
-    cross_encoder = CrossEncoder('BAAI/bge-reranker-v2-m3')
+    # 서버(rerank)와 같은 Cross Encoder 인스턴스 공유
+    cross_encoder = await asyncio.to_thread(get_cross_encoder)
+
+    scores = await asyncio.to_thread(scoring.cross_encoder_scores, cross_encoder, [label], [predict])
 
-    sentence_pairing = [[label, predict]]
+    return float(scores[0])
 
-    scores = cross_encoder.predict(sentence_pairing)
+@router.post('/cross_encoder/batch', summary = 'Evaluate Cross Encoder (batch)')
+async def evaluate_cross_encoder_batch(pairs: ScorePairs, batch_size: int = 64) -> dict:
+    """ N개의 (label, predict) 쌍을 predict 1회로 계산 """
+    cross_encoder = await asyncio.to_thread(get_cross_encoder)
 
-    return scores[0]
+    scores = await asyncio.to_thread(scoring.cross_encoder_scores, cross_encoder, pairs.labels, pairs.predicts, batch_size)
+
+    return {'scores': scores.tolist(), 'mean': float(scores.mean()) if len(scores) else 0.0}
 
 @router.get('/Rouge', summary = 'Calculate Rouge Metrics')
 def calculate_rouge_similarity(label: str, predict: str, rouge_types: List[str] = ['rouge1', 'rouge2', 'rougeL']) -> Dict[str, float]:
@@ -118,16 +123,27 @@ def calculate_rouge_similarity(label: str, predict: str, rouge_types: List[str]
     """
     
     # Validate input 'rouge_types'
-    valid_rouge_types = set(['rouge1', 'rouge2', 'rougeL'])
-    rouge_types = [input_rouge for input_rouge in rouge_types if input_rouge in valid_rouge_types]
-
-    if not rouge_types:
-        raise ValueError("Invalid ROUGE type")
+    rouge_types = scoring.validate_rouge_types(rouge_types)
     
-    # Definition Rouge Calculator
-    scorer = rouge_scorer.RougeScorer(rouge_types, use_stemmer = True)
+    # Rouge Calculator: rouge_types 조합별로 캐시된 scorer 재사용
+    scorer = scoring.get_rouge_scorer(rouge_types)
 
     # Calculate Rouge metrics
     scores = scorer.score(label, predict)
 
-    return {rouge_type: scores[rouge_type]for rouge_type in rouge_types}
\ No newline at end of file
+    return {rouge_type: scores[rouge_type]for rouge_type in rouge_types}
+
+@router.post('/Rouge/batch', summary = 'Calculate Rouge Metrics (batch)')
+async def rouge_batch(pairs: ScorePairs, rouge_types: List[str] = Query(['rouge1', 'rouge2', 'rougeL'])) -> dict:
+    """ N개의 (label, predict) 쌍에 대한 Rouge F-measure """
+    try:
+        rouge_types = scoring.validate_rouge_types(rouge_types)
+    except ValueError as e:
+        raise HTTPException(status_code = 422, detail = str(e))
+
+    scores = await asyncio.to_thread(scoring.rouge_scores, pairs.labels, pairs.predicts, rouge_types)
+
+    return {
+        'scores': {rouge_type: values.tolist() for rouge_type, values in scores.items()},
+        'mean': {rouge_type: float(values.mean()) if len(values) else 0.0 for rouge_type, values in scores.items()}
+    }
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..services.tracing import render_metrics
+
+router = APIRouter(
+    tags = ['Monitoring']   # API docs에 표시될 태그
+)
+
+@router.get('/metrics', summary = "Prometheus metrics: request / RAG stage latency histograms", response_class = PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(content = render_metrics(), media_type = 'text/plain; version=0.0.4; charset=utf-8')
@@ -7,7 +7,8 @@ from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
 from supabase import Client, create_client
 from dotenv import load_dotenv
-from typing import List
+from typing import Iterator, List, Union
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
@@ -17,35 +18,65 @@ SUPABASE_API_KEY = os.getenv('SUPABASE_API_KEY')
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_API_KEY)
 
-def request_table(table_name, col_name = '*', db = supabase) -> pd.DataFrame:
-    """ Get All Rows in supabase table"""
-    all_data = []
-    page_size = 1000
-    page = 0
+def iter_table(table_name, col_name = '*', db = supabase, page_size: int = 1000, key: str = 'id', prefetch: bool = True, as_dataframe: bool = False) -> Iterator[Union[dict, pd.DataFrame]]:
+    """
+    Keyset pagination 으로 supabase table을 스트리밍
+    - 'key > 마지막 key' 조건으로 조회 -> offset 방식과 달리 뒤 페이지도 일정한 속도
+    - prefetch = True : 현재 페이지를 처리하는 동안 다음 페이지를 미리 요청
+    - as_dataframe = True : 페이지 단위 DataFrame 반환, False : row(dict) 단위 반환
+    """
+    # keyset 기준 컬럼이 select 대상에 없으면 추가 후 결과에서 제거
+    select_key = col_name != '*' and key not in [col.strip() for col in col_name.split(',')]
+    columns = f"{key},{col_name}" if select_key else col_name
+
+    def fetch(last_key):
+        query = db.from_(table_name).select(columns).order(key).limit(page_size)
+        if last_key is not None:
+            query = query.gt(key, last_key)
+        return query.execute().data
 
-    while True:
-        start_index = page * page_size
-        end_index = start_index + page_size - 1
+    executor = ThreadPoolExecutor(max_workers = 1) if prefetch else None
 
-        response = supabase.from_(table_name).select(col_name).range(start_index, end_index).execute()
+    try:
+        data = fetch(None)
 
-        data = response.data
+        while data:
+            last_key = data[-1][key]
+            is_last = len(data) < page_size
 
-        if not data:
-            print("[Alert] No Data in table")
+            # 다음 페이지 미리 요청
+            next_page = None
+            if not is_last and executor is not None:
+                next_page = executor.submit(fetch, last_key)
 
-        all_data.extend(data)
+            if select_key:
+                for row in data:
+                    row.pop(key, None)
 
-        # 가져온 데이터가 페이지 크기보다 작으면 마지막 페이지이므로 종료
-        if len(data) < page_size:
-            print("[Alert] All data get Success")
-            break
+            if as_dataframe:
+                yield pd.DataFrame(data)
+            else:
+                yield from data
+
+            if is_last:
+                break
+
+            data = next_page.result() if next_page is not None else fetch(last_key)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait = False, cancel_futures = True)
+
+def request_table(table_name, col_name = '*', db = supabase) -> pd.DataFrame:
+    """ Get All Rows in supabase table"""
+    batches = list(iter_table(table_name, col_name = col_name, db = db, as_dataframe = True))
 
-        page += 1
+    if not batches:
+        print("[Alert] No Data in table")
+        return pd.DataFrame()
 
-    df = pd.DataFrame(all_data)
+    print("[Alert] All data get Success")
 
-    return df
+    return pd.concat(batches, ignore_index = True)
 
 def text_files_to_docs(path, pattern: str = '*.txt') -> List[Document]:
     """ Load '.txt' files and add metadata """
@@ -70,15 +101,16 @@ def docs_text_split(docs: list, size: int, overlap: int, separator: str = '', db
     2. Run Text Split
     3. Insert the latest doc_id into the metadata
     """
-    df = request_table(table_name = 'vectorstore', col_name = 'doc_id', db = db)
-    
-    # Extract latest 'doc_id'
+    # Extract latest 'doc_id': 전체 테이블을 메모리에 올리지 않고 스트리밍하며 최대값 계산
+    max_doc_id = 0
+
     try:
-        df['doc_id'] = df['doc_id'].astype(int)
-        max_doc_id = int(df['doc_id'].max())
-        start_insert_doc_id = max_doc_id + 1
-    except:
-        start_insert_doc_id = 1
+        for row in iter_table(table_name = 'vectorstore', col_name = 'doc_id', db = db or supabase):
+            max_doc_id = max(max_doc_id, int(row['doc_id']))
+    except Exception as e:
+        print(f"[Alert] Failed get latest doc_id: {e}")
+
+    start_insert_doc_id = max_doc_id + 1
 
     # Run Text split
     splitter = RecursiveCharacterTextSplitter(
@@ -113,25 +145,14 @@ def docs_insert_db(splitted_docs, db):
         }
 
         dicts_list.append(row)
-    response = supabase.table('vectorstore').insert(dicts_list).execute()
+    response = (db or supabase).table('vectorstore').insert(dicts_list).execute()
 
     return response
 
-def db_to_document(db) -> List[Document]:
-    """ Supbase table 'vectorstore' all rows into Document object"""
-    df = request_table(
-        table_name = 'vectorstore',
-        col_name = '*',
-        db = db
-    )
-
-    # Data Preprocess
-    df.drop('id', axis = 1, inplace = True)
-    df['date'] = pd.to_datetime(df['date'])
-
-    # DataFrame into Documents
-    docs = [
-        Document(
+def iter_db_documents(db, page_size: int = 1000) -> Iterator[Document]:
+    """ Supbase table 'vectorstore' rows into Document object (lazy) """
+    for row in iter_table(table_name = 'vectorstore', col_name = '*', db = db, page_size = page_size):
+        yield Document(
             page_content = row['page_content'],
             metadata = {
                 'doc_id': f"DOC_{str(row['doc_id'])}",
@@ -139,7 +160,7 @@ def db_to_document(db) -> List[Document]:
                 'source': row['source']
                 }
         )
-        for row in df.to_dict('records')
-    ]
 
-    return docs
\ No newline at end of file
+def db_to_document(db) -> List[Document]:
+    """ Supbase table 'vectorstore' all rows into Document object"""
+    return list(iter_db_documents(db))
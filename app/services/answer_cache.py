@@ -0,0 +1,192 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+from .ingestion import read_ingest_version
+import numpy as np
+import os, time
+
+# Semantic Answer Cache 설정 (환경 변수)
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+ANSWER_CACHE_THRESHOLD = float(os.getenv('ANSWER_CACHE_THRESHOLD', '0.95'))
+ANSWER_CACHE_NEAR_MISS_MARGIN = float(os.getenv('ANSWER_CACHE_NEAR_MISS_MARGIN', '0.05'))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '1000'))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv('ANSWER_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+ANSWER_CACHE_TTL = float(os.getenv('ANSWER_CACHE_TTL', '3600'))
+ANSWER_CACHE_CHECK_INTERVAL = float(os.getenv('ANSWER_CACHE_CHECK_INTERVAL', '30'))
+
+@dataclass
+class CacheEntry:
+    vector: np.ndarray          # normalized float32 query embedding
+    doc_ids: Tuple[str, ...]    # retrieved doc_id (순서 무관 비교)
+    answer: str
+    created_at: float
+    nbytes: int
+
+class SemanticAnswerCache:
+    """
+    Query embedding 기반 LLM 답변 캐시
+    - cosine similarity >= threshold 이고 검색된 doc_id 집합이 같으면 저장된 답변 반환
+    - LRU + TTL eviction, entry 수 / byte 크기 제한
+    - Chroma collection 변경(문서 수 / ingestion marker 변경) 감지 시 전체 무효화
+    """
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        near_miss_margin: float = ANSWER_CACHE_NEAR_MISS_MARGIN,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        max_bytes: int = ANSWER_CACHE_MAX_BYTES,
+        ttl: float = ANSWER_CACHE_TTL,
+        check_interval: float = ANSWER_CACHE_CHECK_INTERVAL
+    ):
+        self.threshold = threshold
+        self.near_miss_margin = near_miss_margin
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.check_interval = check_interval
+
+        self._entries: "OrderedDict[int, CacheEntry]" = OrderedDict()
+        self._next_key = 0
+        self._bytes = 0
+
+        # lookup용 matrix (entry 변경 시 lazy rebuild)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+
+        # collection 변경 감지
+        self._fingerprint = None
+        self._checked_at = 0.0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.near_misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype = np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _remove(self, key: int):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+        self._matrix = None
+
+    def _expire(self, now: float):
+        """ TTL 지난 entry 제거 (OrderedDict는 LRU 순서이므로 전체 확인) """
+        expired = [key for key, entry in self._entries.items() if now - entry.created_at > self.ttl]
+        for key in expired:
+            self._remove(key)
+            self.evictions += 1
+
+    def _build_matrix(self):
+        self._matrix_keys = list(self._entries.keys())
+        if self._matrix_keys:
+            self._matrix = np.stack([self._entries[key].vector for key in self._matrix_keys])
+        else:
+            self._matrix = np.empty((0, 0), dtype = np.float32)
+
+    def lookup(self, query_vector: Sequence[float], doc_ids: Sequence[str]) -> Optional[str]:
+        """ Return cached answer or None """
+        now = time.time()
+        self._expire(now)
+
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        if self._matrix is None:
+            self._build_matrix()
+
+        query = self._normalize(query_vector)
+        similarities = self._matrix @ query
+        best = int(np.argmax(similarities))
+        best_score = float(similarities[best])
+        key = self._matrix_keys[best]
+        entry = self._entries[key]
+
+        if best_score >= self.threshold and entry.doc_ids == tuple(sorted(doc_ids)):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.answer
+
+        # 임계값 근처 or 유사하지만 검색 문서가 다른 경우: threshold 튜닝 지표
+        if best_score >= self.threshold - self.near_miss_margin:
+            self.near_misses += 1
+
+        self.misses += 1
+        return None
+
+    def store(self, query_vector: Sequence[float], doc_ids: Sequence[str], answer: str):
+        vector = self._normalize(query_vector)
+        nbytes = vector.nbytes + len(answer.encode('utf-8'))
+
+        if nbytes > self.max_bytes:
+            return
+
+        entry = CacheEntry(
+            vector = vector,
+            doc_ids = tuple(sorted(doc_ids)),
+            answer = answer,
+            created_at = time.time(),
+            nbytes = nbytes
+        )
+
+        self._entries[self._next_key] = entry
+        self._next_key += 1
+        self._bytes += nbytes
+        self._matrix = None
+
+        # LRU eviction
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self):
+        """ 전체 캐시 무효화 """
+        self._entries.clear()
+        self._bytes = 0
+        self._matrix = None
+        self.invalidations += 1
+
+    def check_collection(self, vectorstore):
+        """ Chroma collection 변경 시 무효화 (check_interval 마다 문서 수 / ingestion marker 확인) """
+        now = time.time()
+        if now - self._checked_at < self.check_interval:
+            return
+
+        self._checked_at = now
+
+        try:
+            # 문서 수 + ingestion marker(내용만 바뀐 경우 감지)
+            fingerprint = (
+                vectorstore._collection.count(),
+                read_ingest_version(getattr(vectorstore, '_persist_directory', None))
+            )
+        except Exception as e:
+            print(f"[Answer Cache] Collection check Error: {e}")
+            return
+
+        if self._fingerprint is not None and fingerprint != self._fingerprint:
+            print("[Answer Cache] Collection changed, invalidate")
+            self.invalidate()
+
+        self._fingerprint = fingerprint
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'near_misses': self.near_misses,
+            'hit_rate': round(self.hits / total, 5) if total else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'threshold': self.threshold
+        }
@@ -0,0 +1,186 @@
+"""
+Persistent Embedding Cache (프로세스 간 공유)
+
+- key    : sha256(model name + normalize flag + kind(document / query) + text)
+- vector : dim 별 float32 flat file (vectors_<dim>.f32), slot 단위 고정 길이 -> pread / pwrite, OS page cache 공유
+- index  : SQLite (WAL) key -> slot, last_access
+- 용량   : max_entries 초과 시 오래 사용되지 않은 entry부터 제거, slot 재사용
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables.config import run_in_executor
+import numpy as np
+import hashlib, os, sqlite3, threading, time
+
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', 'model_cache/embeddings')
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '200000'))
+
+class EmbeddingStore:
+    """ float32 vector file + SQLite index """
+    def __init__(self, path: str = EMBEDDING_CACHE_DIR, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.mkdir(parents = True, exist_ok = True)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._fds: Dict[int, int] = {}
+
+        self._conn = sqlite3.connect(self.path / 'index.sqlite3', timeout = 30, check_same_thread = False, isolation_level = None)
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, dim INTEGER, slot INTEGER, last_access REAL);
+            CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+            CREATE TABLE IF NOT EXISTS slots (dim INTEGER PRIMARY KEY, next_slot INTEGER);
+            CREATE TABLE IF NOT EXISTS free_slots (dim INTEGER, slot INTEGER);
+        """)
+
+        self.hits = 0
+        self.misses = 0
+
+    def _fd(self, dim: int) -> int:
+        if dim not in self._fds:
+            self._fds[dim] = os.open(self.path / f'vectors_{dim}.f32', os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fds[dim]
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """ 저장된 vector 조회 (없는 key는 결과에 포함되지 않음) """
+        found = {}
+        unique = list(dict.fromkeys(keys))
+
+        with self._lock:
+            rows = []
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                rows.extend(self._conn.execute(
+                    f"SELECT key, dim, slot FROM entries WHERE key IN ({', '.join('?' for _ in batch)})", batch
+                ).fetchall())
+
+            for key, dim, slot in rows:
+                buffer = os.pread(self._fd(dim), dim * 4, slot * dim * 4)
+                if len(buffer) == dim * 4:
+                    found[key] = np.frombuffer(buffer, dtype = np.float32).copy()
+
+            if found:
+                now = time.time()
+                self._conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", [(now, key) for key in found])
+
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]):
+        """ vector 저장 (slot 할당은 SQLite write transaction으로 프로세스 간 직렬화) """
+        if not items:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, vector in items.items():
+                    vector = np.asarray(vector, dtype = np.float32)
+                    dim = int(vector.shape[0])
+
+                    if self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone():
+                        continue
+
+                    slot = self._allocate(dim)
+
+                    # vector를 먼저 기록한 뒤 index 등록 -> 다른 프로세스가 미완성 vector를 읽지 않음
+                    os.pwrite(self._fd(dim), vector.tobytes(), slot * dim * 4)
+                    self._conn.execute("INSERT INTO entries (key, dim, slot, last_access) VALUES (?, ?, ?, ?)", (key, dim, slot, now))
+
+                self._evict()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _allocate(self, dim: int) -> int:
+        row = self._conn.execute("SELECT rowid, slot FROM free_slots WHERE dim = ? LIMIT 1", (dim,)).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM free_slots WHERE rowid = ?", (row[0],))
+            return row[1]
+
+        row = self._conn.execute("SELECT next_slot FROM slots WHERE dim = ?", (dim,)).fetchone()
+        slot = row[0] if row else 0
+        self._conn.execute("INSERT OR REPLACE INTO slots (dim, next_slot) VALUES (?, ?)", (dim, slot + 1))
+
+        return slot
+
+    def _evict(self):
+        """ max_entries 초과분 + 5% 여유분을 LRU 순서로 제거 """
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        excess = count - self.max_entries + max(1, self.max_entries // 20)
+        rows = self._conn.execute("SELECT key, dim, slot FROM entries ORDER BY last_access LIMIT ?", (excess,)).fetchall()
+
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _, _ in rows])
+        self._conn.executemany("INSERT INTO free_slots (dim, slot) VALUES (?, ?)", [(dim, slot) for _, dim, slot in rows])
+
+    def stats(self) -> dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {'entries': count, 'hits': self.hits, 'misses': self.misses, 'max_entries': self.max_entries}
+
+    def close(self):
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+            self._conn.close()
+
+def cache_key(model_name: str, normalize: bool, kind: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\x00{int(normalize)}\x00{kind}\x00{text}".encode('utf-8')).hexdigest()
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper: EmbeddingStore에 없는 텍스트만 실제 모델로 임베딩
+    - model_name / normalize 가 key에 포함되므로 여러 모델이 같은 store 공유 가능
+    """
+    def __init__(self, embeddings: Embeddings, store: EmbeddingStore, model_name: Optional[str] = None, normalize: Optional[bool] = None):
+        self.embeddings = embeddings
+        self.store = store
+        self.model_name = model_name or getattr(embeddings, 'model_name', None) or getattr(embeddings, 'model', type(embeddings).__name__)
+
+        if normalize is None:
+            normalize = bool((getattr(embeddings, 'encode_kwargs', None) or {}).get('normalize_embeddings', False))
+        self.normalize = normalize
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [cache_key(self.model_name, self.normalize, kind, text) for text in texts]
+        found = self.store.get_many(keys)
+
+        # 중복 제거 후 없는 텍스트만 임베딩
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+
+        if missing:
+            if kind == 'query':
+                vectors = [self.embeddings.embed_query(text) for text in missing.values()]
+            else:
+                vectors = self.embeddings.embed_documents(list(missing.values()))
+
+            computed = {key: np.asarray(vector, dtype = np.float32) for key, vector in zip(missing.keys(), vectors)}
+            self.store.put_many(computed)
+            found.update(computed)
+
+        return [found[key].tolist() for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(list(texts), 'document')
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], 'query')[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await run_in_executor(None, self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await run_in_executor(None, self.embed_query, text)
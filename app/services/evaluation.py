@@ -0,0 +1,205 @@
+"""
+Evaluation Engine
+
+1. Prediction : 제한된 동시성 + RPM/TPM token bucket 으로 chain.abatch 실행
+               완료된 row는 checkpoint(JSONL)에 즉시 기록 -> 중단 후 재실행 시 이어서 진행
+2. Scoring    : 캐시된 prediction 전체에 대해 metric을 한 번에 계산
+               (embedding distance, cross encoder, ROUGE, MRR)
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from .rate_limit import RateLimiter, count_tokens
+from . import scoring
+import pandas as pd
+import asyncio, json
+
+@dataclass
+class EvaluationRecord:
+    key: str
+    query: str
+    label: str
+    prediction: Optional[str] = None
+    label_id: Optional[str] = None
+    retrieved_ids: List[str] = field(default_factory = list)
+
+class EvaluationRunner:
+    """
+    - chain           : query(str) -> answer(str) Runnable (None 이면 답변 예측 생략)
+    - retriever       : query(str) -> List[Document] (지정 시 MRR 용 doc_id 수집)
+    - checkpoint_path : 완료된 prediction 저장 위치 (JSONL)
+    - max_concurrency : 동시에 실행되는 chain 호출 수
+    - rpm / tpm       : 분당 요청 / 토큰 제한 (None: 제한 없음)
+    """
+    def __init__(
+        self,
+        chain = None,
+        retriever = None,
+        checkpoint_path: Optional[str] = None,
+        max_concurrency: int = 4,
+        batch_size: int = 16,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        token_counter: Callable[[str], int] = count_tokens
+    ):
+        self.chain = chain
+        self.retriever = retriever
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(rpm = rpm, tpm = tpm)
+        self.token_counter = token_counter
+
+        self.failed = set()
+
+    def _load_checkpoint(self) -> Dict[str, dict]:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return {}
+
+        done = {}
+        with open(self.checkpoint_path, 'r', encoding = 'utf-8') as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    done[row['key']] = row
+
+        return done
+
+    def _save_checkpoint(self, records: Sequence[EvaluationRecord]):
+        if self.checkpoint_path is None:
+            return
+
+        self.checkpoint_path.parent.mkdir(parents = True, exist_ok = True)
+
+        with open(self.checkpoint_path, 'a', encoding = 'utf-8') as f:
+            for record in records:
+                f.write(json.dumps({
+                    'key': record.key,
+                    'prediction': record.prediction,
+                    'retrieved_ids': record.retrieved_ids
+                }, ensure_ascii = False) + '\n')
+
+    async def _predict_batch(self, batch: List[EvaluationRecord]) -> List[EvaluationRecord]:
+        queries = [record.query for record in batch]
+        config = {'max_concurrency': self.max_concurrency}
+
+        await self.limiter.acquire(requests = len(batch), tokens = sum(self.token_counter(query) for query in queries))
+
+        answers = [None] * len(batch)
+        retrieved = [None] * len(batch)
+
+        tasks = []
+        if self.chain is not None:
+            tasks.append(self.chain.abatch(queries, config = config, return_exceptions = True))
+        if self.retriever is not None:
+            tasks.append(self.retriever.abatch(queries, config = config, return_exceptions = True))
+
+        results = await asyncio.gather(*tasks)
+        if self.chain is not None:
+            answers = results.pop(0)
+        if self.retriever is not None:
+            retrieved = results.pop(0)
+
+        completed = []
+        for record, answer, docs in zip(batch, answers, retrieved):
+            if isinstance(answer, Exception) or isinstance(docs, Exception):
+                print(f"[Evaluation] {record.key} Error: {answer if isinstance(answer, Exception) else docs}")
+                self.failed.add(record.key)
+                continue
+
+            record.prediction = answer
+            record.retrieved_ids = [doc.metadata.get('doc_id', '') for doc in docs] if docs is not None else []
+            completed.append(record)
+
+        self._save_checkpoint(completed)
+
+        return completed
+
+    async def predict(
+        self,
+        df: pd.DataFrame,
+        query_col: str,
+        label_col: str,
+        key_col: Optional[str] = None,
+        label_id_col: Optional[str] = None
+    ) -> List[EvaluationRecord]:
+        """ checkpoint에 없는 row만 예측, DataFrame 순서대로 반환 (실패한 row 제외) """
+        keys = df[key_col].astype(str).tolist() if key_col else [str(index) for index in df.index]
+        label_ids = df[label_id_col].astype(str).tolist() if label_id_col else [None] * len(df)
+
+        records = [
+            EvaluationRecord(key = key, query = str(query), label = str(label), label_id = label_id)
+            for key, query, label, label_id in zip(keys, df[query_col].tolist(), df[label_col].tolist(), label_ids)
+        ]
+
+        done = self._load_checkpoint()
+        for record in records:
+            if record.key in done:
+                record.prediction = done[record.key]['prediction']
+                record.retrieved_ids = done[record.key].get('retrieved_ids', [])
+
+        pending = [record for record in records if record.key not in done]
+        print(f"[Evaluation] total: {len(records)}, checkpoint: {len(records) - len(pending)}, pending: {len(pending)}")
+
+        for start in range(0, len(pending), self.batch_size):
+            await self._predict_batch(pending[start:start + self.batch_size])
+
+        return [record for record in records if record.key not in self.failed]
+
+def score_records(
+    records: Sequence[EvaluationRecord],
+    embedding = None,
+    cross_encoder = None,
+    rouge_types: Optional[Sequence[str]] = ('rouge1', 'rouge2', 'rougeL')
+) -> pd.DataFrame:
+    """ 캐시된 prediction에 대해 metric 일괄 계산 (지정한 metric만) """
+    df = pd.DataFrame({'key': [record.key for record in records]})
+
+    answered = [record for record in records if record.prediction is not None]
+    labels = [record.label for record in answered]
+    predictions = [record.prediction for record in answered]
+    answered_index = [i for i, record in enumerate(records) if record.prediction is not None]
+
+    def assign(column: str, values):
+        df[column] = float('nan')
+        df.loc[answered_index, column] = values
+
+    if embedding is not None and answered:
+        assign('embedding_distance', scoring.embedding_distances(embedding, labels, predictions).round(5))
+
+    if cross_encoder is not None and answered:
+        assign('cross_encoder', scoring.cross_encoder_scores(cross_encoder, labels, predictions))
+
+    if rouge_types and answered:
+        for rouge_type, values in scoring.rouge_scores(labels, predictions, rouge_types).items():
+            assign(rouge_type, values)
+
+    if any(record.label_id is not None for record in records):
+        df['mrr'] = scoring.mrr_scores([record.label_id for record in records], [record.retrieved_ids for record in records])
+
+    return df
+
+async def evaluate(
+    df: pd.DataFrame,
+    query_col: str,
+    label_col: str,
+    runner: EvaluationRunner,
+    key_col: Optional[str] = None,
+    label_id_col: Optional[str] = None,
+    embedding = None,
+    cross_encoder = None,
+    rouge_types: Optional[Sequence[str]] = ('rouge1', 'rouge2', 'rougeL')
+) -> Dict[str, Any]:
+    """ Prediction(병렬, checkpoint) -> Scoring(1 pass) """
+    records = await runner.predict(df, query_col, label_col, key_col = key_col, label_id_col = label_id_col)
+
+    # CPU 연산은 event loop 밖에서 실행
+    scores = await asyncio.to_thread(score_records, records, embedding, cross_encoder, rouge_types)
+
+    metric_cols = [col for col in scores.columns if col != 'key']
+
+    return {
+        'mean': {col: round(float(scores[col].mean()), 5) for col in metric_cols},
+        'failed': len(runner.failed),
+        'scores': scores
+    }
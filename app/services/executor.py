@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import os
+
+# CPU-bound 모델 연산(Cross Encoder 등) 전용 스레드 수
+MODEL_EXECUTOR_WORKERS = int(os.getenv('MODEL_EXECUTOR_WORKERS', '2'))
+
+_model_executor: Optional[ThreadPoolExecutor] = None
+
+def get_model_executor() -> ThreadPoolExecutor:
+    """
+    모델 추론 전용 Bounded Executor
+    - AnyIO 기본 스레드풀과 분리하여, 무거운 연산이 I/O 대기 요청의 스레드를 잠식하지 않도록 함
+    """
+    global _model_executor
+
+    if _model_executor is None:
+        _model_executor = ThreadPoolExecutor(
+            max_workers = MODEL_EXECUTOR_WORKERS,
+            thread_name_prefix = 'model'
+        )
+
+    return _model_executor
+
+def shutdown_model_executor():
+    """ Server Down >> Executor 종료 """
+    global _model_executor
+
+    if _model_executor is not None:
+        _model_executor.shutdown(wait = False, cancel_futures = True)
+        _model_executor = None
@@ -0,0 +1,294 @@
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+from langchain_core.messages import BaseMessage
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableLambda
+from .rate_limit import RateLimiter, count_tokens
+import asyncio, json, os, queue, random, threading
+import httpx
+
+# Gemini Client 설정 (환경 변수)
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL', 'https://generativelanguage.googleapis.com')
+GEMINI_MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+GEMINI_RPM = float(os.getenv('GEMINI_RPM', '60'))
+GEMINI_TPM = float(os.getenv('GEMINI_TPM', '0')) or None
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', '4'))
+GEMINI_BACKOFF = float(os.getenv('GEMINI_BACKOFF', '1.0'))
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '120'))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class GeminiError(Exception):
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Gemini API {status_code}: {message}")
+        self.status_code = status_code
+
+@dataclass(frozen = True)
+class GeminiModel:
+    """ (model, temperature, max_tokens) 별 요청 설정 """
+    name: str
+    temperature: float = 0.5
+    max_tokens: int = 2048
+
+    def body(self, prompt: Union[str, PromptValue, List[BaseMessage]], system: Optional[str] = None) -> dict:
+        contents, system_parts = _to_contents(prompt)
+        if system:
+            system_parts.insert(0, {'text': system})
+
+        body = {
+            'contents': contents,
+            'generationConfig': {'temperature': self.temperature, 'maxOutputTokens': self.max_tokens}
+        }
+        if system_parts:
+            body['systemInstruction'] = {'parts': system_parts}
+
+        return body
+
+def _to_contents(prompt: Union[str, PromptValue, List[BaseMessage]]) -> Tuple[List[dict], List[dict]]:
+    """ str / PromptValue / Message list -> Gemini contents, systemInstruction parts """
+    if isinstance(prompt, str):
+        return [{'role': 'user', 'parts': [{'text': prompt}]}], []
+
+    messages = prompt.to_messages() if isinstance(prompt, PromptValue) else prompt
+    contents, system_parts = [], []
+
+    for message in messages:
+        if message.type == 'system':
+            system_parts.append({'text': message.content})
+        else:
+            contents.append({'role': 'model' if message.type == 'ai' else 'user', 'parts': [{'text': message.content}]})
+
+    return contents, system_parts
+
+def _text(response: dict) -> str:
+    candidates = response.get('candidates') or [{}]
+    parts = (candidates[0].get('content') or {}).get('parts') or []
+    return ''.join(part.get('text', '') for part in parts)
+
+class GeminiClient:
+    """
+    Shared Gemini Client (REST)
+    - 모델 설정은 (model, temperature, max_tokens) 별로 캐시, HTTP connection pool 1개 공유
+    - 동시 요청 수 semaphore + RPM / TPM token bucket (요청 스레드를 sleep 하지 않음)
+    - 429 / 5xx 는 지수 backoff + jitter 재시도 (Retry-After 우선)
+    - 모든 요청은 client 전용 event loop 스레드에서 실행
+      -> FastAPI(async), notebook / script(sync) 어느 쪽에서 호출해도 같은 limiter를 공유
+    """
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = GEMINI_BASE_URL,
+        max_concurrency: int = GEMINI_MAX_CONCURRENCY,
+        rpm: Optional[float] = GEMINI_RPM,
+        tpm: Optional[float] = GEMINI_TPM,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        backoff: float = GEMINI_BACKOFF,
+        timeout: float = GEMINI_TIMEOUT
+    ):
+        self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._models: Dict[Tuple[str, float, int], GeminiModel] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+        # client loop 에서 생성
+        self._http: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiter: Optional[RateLimiter] = None
+
+        # Metrics
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def model(self, name: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048) -> GeminiModel:
+        """ (model, temperature, max_tokens) 별 모델 설정 1개 """
+        key = (name, temperature, max_tokens)
+
+        with self._lock:
+            if key not in self._models:
+                self._models[key] = GeminiModel(name, temperature, max_tokens)
+            return self._models[key]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target = self._loop.run_forever, name = 'gemini-client', daemon = True)
+                self._thread.start()
+            return self._loop
+
+    def _submit(self, coro) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _init_loop_state(self):
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url = self.base_url,
+                timeout = self.timeout,
+                limits = httpx.Limits(max_connections = self.max_concurrency, max_keepalive_connections = self.max_concurrency),
+                headers = {'x-goog-api-key': self.api_key or ''}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._limiter = RateLimiter(rpm = self.rpm, tpm = self.tpm)
+
+    def _delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return float(retry_after) + random.uniform(0, self.backoff)
+            except ValueError:
+                pass
+        # Full jitter
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def _request(self, model: GeminiModel, body: dict, stream: bool, on_chunk = None) -> str:
+        """ client loop 에서 실행: 제한 -> 요청 -> 429 / 5xx 재시도 """
+        self._init_loop_state()
+
+        path = f"/v1beta/models/{model.name}:{'streamGenerateContent' if stream else 'generateContent'}"
+        params = {'alt': 'sse'} if stream else None
+        prompt_tokens = sum(count_tokens(part.get('text', '')) for content in body['contents'] for part in content['parts'])
+
+        delivered = False
+
+        for attempt in range(self.max_retries + 1):
+            await self._limiter.acquire(requests = 1, tokens = prompt_tokens)
+
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    if not stream:
+                        response = await self._http.post(path, json = body)
+                        if response.status_code == 200:
+                            return _text(response.json())
+                    else:
+                        async with self._http.stream('POST', path, params = params, json = body) as response:
+                            if response.status_code == 200:
+                                chunks = []
+                                async for line in response.aiter_lines():
+                                    if line.startswith('data:'):
+                                        chunk = _text(json.loads(line[5:]))
+                                        if chunk:
+                                            chunks.append(chunk)
+                                            on_chunk(chunk)
+                                            delivered = True
+                                return ''.join(chunks)
+                            await response.aread()
+
+                    status, message, retry_after = response.status_code, response.text[:500], response.headers.get('Retry-After')
+
+                except httpx.TransportError as e:
+                    status, message, retry_after = 503, str(e), None
+
+            # 스트리밍 도중 일부가 이미 전달된 경우는 재시도하지 않음 (중복 출력 방지)
+            if status not in RETRY_STATUS or attempt == self.max_retries or delivered:
+                self.failures += 1
+                raise GeminiError(status, message)
+
+            self.retries += 1
+            await asyncio.sleep(self._delay(attempt, retry_after))
+
+    async def agenerate(self, prompt, model: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048, system: Optional[str] = None) -> str:
+        config = self.model(model, temperature, max_tokens)
+        return await asyncio.wrap_future(self._submit(self._request(config, config.body(prompt, system), stream = False)))
+
+    def generate(self, prompt, model: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048, system: Optional[str] = None) -> str:
+        config = self.model(model, temperature, max_tokens)
+        return self._submit(self._request(config, config.body(prompt, system), stream = False)).result()
+
+    async def astream(self, prompt, model: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048, system: Optional[str] = None) -> AsyncIterator[str]:
+        """ 호출한 event loop 로 chunk 전달 """
+        config = self.model(model, temperature, max_tokens)
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        future = self._submit(self._request(config, config.body(prompt, system), stream = True, on_chunk = lambda chunk: loop.call_soon_threadsafe(chunks.put_nowait, chunk)))
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(chunks.put_nowait, done))
+
+        try:
+            while (chunk := await chunks.get()) is not done:
+                yield chunk
+        finally:
+            if not future.done():
+                future.cancel()
+
+        future.result()
+
+    def stream(self, prompt, model: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048, system: Optional[str] = None) -> Iterator[str]:
+        config = self.model(model, temperature, max_tokens)
+        chunks: queue.Queue = queue.Queue()
+        done = object()
+
+        future = self._submit(self._request(config, config.body(prompt, system), stream = True, on_chunk = chunks.put))
+        future.add_done_callback(lambda _: chunks.put(done))
+
+        while (chunk := chunks.get()) is not done:
+            yield chunk
+
+        future.result()
+
+    def as_runnable(self, model: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048) -> RunnableLambda:
+        """ LCEL 용: prompt | client.as_runnable(...) | parser """
+        return RunnableLambda(
+            lambda prompt: self.generate(prompt, model, temperature, max_tokens),
+            afunc = lambda prompt: self.agenerate(prompt, model, temperature, max_tokens),
+            name = f'Gemini[{model}]'
+        )
+
+    def stats(self) -> dict:
+        return {
+            'models': len(self._models),
+            'requests': self.requests,
+            'retries': self.retries,
+            'failures': self.failures,
+            'max_concurrency': self.max_concurrency,
+            'rpm': self.rpm,
+            'tpm': self.tpm
+        }
+
+    def close(self):
+        """ Connection pool / event loop 종료 """
+        with self._lock:
+            loop, self._loop = self._loop, None
+
+        if loop is None:
+            return
+
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.aclose(), loop).result()
+            self._http = None
+
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout = 5)
+        loop.close()
+
+_clients: Dict[Optional[str], GeminiClient] = {}
+_clients_lock = threading.Lock()
+
+def get_gemini_client(api_key: Optional[str] = None) -> GeminiClient:
+    """ API KEY 별 공유 GeminiClient """
+    api_key = api_key or os.getenv('GEMINI_API_KEY')
+
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = GeminiClient(api_key = api_key)
+        return _clients[api_key]
+
+def close_gemini_clients():
+    """ Server Down >> 모든 client 종료 """
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+
+    for client in clients:
+        client.close()
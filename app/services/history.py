@@ -0,0 +1,275 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .rate_limit import count_tokens, get_encoder
+import numpy as np
+import asyncio, hashlib, os
+
+# History Manager 설정 (환경 변수)
+HISTORY_TOKENIZER = os.getenv('HISTORY_TOKENIZER', 'o200k_base')       # gpt-oss 계열 tokenizer
+HISTORY_TOKEN_BUDGET = int(os.getenv('HISTORY_TOKEN_BUDGET', '1024'))   # history_context 전체 상한
+HISTORY_SUMMARY_TOKENS = int(os.getenv('HISTORY_SUMMARY_TOKENS', '256'))
+HISTORY_RECENT_TURNS = int(os.getenv('HISTORY_RECENT_TURNS', '3'))      # 원문 유지 최대 턴 수
+HISTORY_MAX_TURN_TOKENS = int(os.getenv('HISTORY_MAX_TURN_TOKENS', '384'))
+HISTORY_RELEVANCE_THRESHOLD = float(os.getenv('HISTORY_RELEVANCE_THRESHOLD', '0'))    # 0: 관련도 필터 미사용
+HISTORY_SUMMARY_ENABLED = os.getenv('HISTORY_SUMMARY_ENABLED', 'true').lower() == 'true'
+HISTORY_SUMMARY_CACHE_SIZE = int(os.getenv('HISTORY_SUMMARY_CACHE_SIZE', '1000'))
+
+HISTORY_HEADER = "\n\n[Previous Conversation History]\n"
+SUMMARY_HEADER = "[Summary of Earlier Conversation]\n"
+
+SUMMARY_PROMPT = """아래는 사내 총무 챗봇과 사용자의 이전 대화 요약과 이어지는 대화야.
+이후 질문에 답할 때 필요한 사실(사용자가 물어본 주제, 안내된 절차, 담당 부서, 날짜 / 숫자)만 남겨서
+{max_tokens} 토큰 이내의 한국어 요약으로 다시 써줘. 요약만 출력해.
+
+[기존 요약]
+{summary}
+
+[이어지는 대화]
+{turns}
+"""
+
+@dataclass
+class HistoryContext:
+    """ history_context 와 구성 정보 (토큰 수, 턴 처리 결과) """
+    text: str = ''
+    tokens: int = 0
+    verbatim_turns: int = 0
+    summarized_turns: int = 0
+    dropped_turns: int = 0
+    summary_source: str = 'none'     # none / cache / extractive
+
+@dataclass
+class _Summary:
+    last_turn: str                   # 요약에 포함된 마지막 턴의 hash
+    text: str
+
+def _turn_text(turn: dict) -> str:
+    return f"USER: {turn.get('user', '')}\nAI Response: {turn.get('assistant', '')}\n\n"
+
+def _digest(turn: dict) -> str:
+    return hashlib.sha1(_turn_text(turn).encode('utf-8')).hexdigest()
+
+class HistoryManager:
+    """
+    Token-budgeted Conversation History
+    - 최근 턴은 원문 유지 (턴별 max_turn_tokens 로 답변 절단), 전체 token_budget 이내
+    - budget을 넘는 이전 턴은 conversation_id 별 rolling summary 로 압축
+      . 요약은 요청 경로 밖(background)에서 LLM으로 갱신, 캐시된 요약이 아직 없는 구간은 질문만 남긴 extractive 요약 사용
+    - relevance_threshold > 0 : 현재 질문과 관련도가 낮은 이전 턴 제외 (embedding, 직전 턴은 항상 유지)
+    """
+    def __init__(
+        self,
+        llm = None,
+        embedding = None,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_tokens: int = HISTORY_SUMMARY_TOKENS,
+        recent_turns: int = HISTORY_RECENT_TURNS,
+        max_turn_tokens: int = HISTORY_MAX_TURN_TOKENS,
+        relevance_threshold: float = HISTORY_RELEVANCE_THRESHOLD,
+        summary_enabled: bool = HISTORY_SUMMARY_ENABLED,
+        cache_size: int = HISTORY_SUMMARY_CACHE_SIZE,
+        encoding: str = HISTORY_TOKENIZER
+    ):
+        self.llm = llm
+        self.embedding = embedding
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.recent_turns = recent_turns
+        self.max_turn_tokens = max_turn_tokens
+        self.relevance_threshold = relevance_threshold
+        self.summary_enabled = summary_enabled and llm is not None
+        self.cache_size = cache_size
+        self.encoding = encoding
+
+        self._summaries: 'OrderedDict[str, _Summary]' = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+
+        # Metrics
+        self.requests = 0
+        self.history_tokens_total = 0
+        self.prompt_tokens_total = 0
+        self.prompt_tokens_max = 0
+        self.summary_hits = 0
+        self.summaries_generated = 0
+        self.summary_failures = 0
+        self.dropped_turns = 0
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.encoding)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """ max_tokens 이내로 절단 (tokenizer 없으면 문자 수 기준) """
+        encoder = get_encoder(self.encoding)
+
+        if encoder is None:
+            return text if len(text) <= max_tokens * 2 else text[:max_tokens * 2] + '...'
+
+        tokens = encoder.encode(text, disallowed_special = ())
+        return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens]) + '...'
+
+    @staticmethod
+    def normalize(history: Any) -> List[dict]:
+        """ javascript history -> [{'user': str, 'assistant': str}] (형식이 맞지 않는 항목 제외) """
+        if not history or not isinstance(history, list):
+            return []
+
+        return [
+            {'user': str(turn.get('user', '')), 'assistant': str(turn.get('assistant', ''))}
+            for turn in history
+            if isinstance(turn, dict) and (turn.get('user') or turn.get('assistant'))
+        ]
+
+    async def _relevant(self, turns: List[dict], query_vector: Optional[Sequence[float]]) -> Tuple[List[dict], int]:
+        """ 현재 질문과 cosine 유사도가 threshold 미만인 이전 턴 제외 (직전 턴은 후속 질문 해석에 필요하므로 유지) """
+        if self.relevance_threshold <= 0 or self.embedding is None or query_vector is None or len(turns) <= 1:
+            return turns, 0
+
+        older = turns[:-1]
+        vectors = np.asarray(await self.embedding.aembed_documents([turn['user'] for turn in older]), dtype = np.float32)
+        query = np.asarray(query_vector, dtype = np.float32)
+
+        similarities = vectors @ query / (np.linalg.norm(vectors, axis = 1) * np.linalg.norm(query) + 1e-12)
+        kept = [turn for turn, similarity in zip(older, similarities) if similarity >= self.relevance_threshold]
+
+        return kept + turns[-1:], len(older) - len(kept)
+
+    def _extractive(self, turns: Sequence[dict]) -> str:
+        """ LLM 요약이 없는 구간: 사용자 질문만 나열 """
+        return ''.join(f"- USER: {self.truncate(turn['user'], 64)}\n" for turn in turns)
+
+    def _cached_summary(self, conversation_id: Optional[str], older: List[dict]) -> Tuple[Optional[_Summary], List[dict]]:
+        """ 캐시된 요약 + 요약에 아직 포함되지 않은 턴 """
+        if conversation_id is None or conversation_id not in self._summaries:
+            return None, older
+
+        summary = self._summaries[conversation_id]
+
+        # 클라이언트 history는 최근 N개만 유지 -> 요약된 마지막 턴 이후만 새로 압축
+        # (요약된 턴이 history 밖으로 밀려나도 요약에는 남아 있음)
+        digests = [_digest(turn) for turn in older]
+        if summary.last_turn not in digests:
+            del self._summaries[conversation_id]
+            return None, older
+
+        self._summaries.move_to_end(conversation_id)
+        return summary, older[len(digests) - digests[::-1].index(summary.last_turn):]
+
+    def _schedule_summary(self, conversation_id: str, uncovered: List[dict], summary: Optional[_Summary]):
+        """ 요청 경로를 막지 않도록 background 에서 rolling summary 갱신 (conversation 당 1개) """
+        if not self.summary_enabled or conversation_id in self._pending:
+            return
+
+        task = asyncio.create_task(self._summarize(conversation_id, list(uncovered), summary))
+        self._pending[conversation_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(conversation_id, None))
+
+    async def _summarize(self, conversation_id: str, uncovered: List[dict], summary: Optional[_Summary]):
+        turns = ''.join(_turn_text({'user': turn['user'], 'assistant': self.truncate(turn['assistant'], self.max_turn_tokens)}) for turn in uncovered)
+
+        try:
+            text = await self.llm.ainvoke(SUMMARY_PROMPT.format(
+                max_tokens = self.summary_tokens,
+                summary = summary.text if summary is not None else '(없음)',
+                turns = turns
+            ))
+        except Exception as e:
+            print(f"[History] Summary failed: {e}")
+            self.summary_failures += 1
+            return
+
+        text = getattr(text, 'content', text)
+        self._summaries[conversation_id] = _Summary(last_turn = _digest(uncovered[-1]), text = self.truncate(str(text).strip(), self.summary_tokens))
+        self._summaries.move_to_end(conversation_id)
+        self.summaries_generated += 1
+
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last = False)
+
+    async def abuild(self, history: Any, conversation_id: Optional[str] = None, query_vector: Optional[Sequence[float]] = None) -> HistoryContext:
+        """ history -> token budget 이내의 history_context """
+        self.requests += 1
+
+        turns = self.normalize(history)
+        if not turns:
+            return HistoryContext()
+
+        # 최근 recent_turns 개는 원문 후보, 그 이전은 rolling summary 대상
+        split = max(0, len(turns) - self.recent_turns)
+        older, recent = turns[:split], turns[split:]
+        summary, uncovered = self._cached_summary(conversation_id, older)
+
+        if uncovered and conversation_id is not None:
+            self._schedule_summary(conversation_id, uncovered, summary)
+
+        # 관련도 필터: 요약되지 않은 이전 턴 + 최근 턴 중 현재 질문과 무관한 턴 제외 (요약 갱신에는 포함)
+        kept, dropped = await self._relevant(uncovered + recent, query_vector)
+        self.dropped_turns += dropped
+        kept_ids = {id(turn) for turn in kept}
+        uncovered = [turn for turn in uncovered if id(turn) in kept_ids]
+        recent = [turn for turn in recent if id(turn) in kept_ids]
+
+        budget = self.token_budget - self.count(HISTORY_HEADER)
+
+        # 1. 최근 턴부터 원문 유지 (budget 초과 시 이전 턴은 요약 영역으로, 요약 자리를 남겨둠)
+        verbatim: List[str] = []
+        used = 0
+        for i, turn in enumerate(reversed(recent)):
+            text = _turn_text({'user': self.truncate(turn['user'], self.max_turn_tokens), 'assistant': self.truncate(turn['assistant'], self.max_turn_tokens)})
+            tokens = self.count(text)
+            reserve = self.summary_tokens if (summary is not None or uncovered or i + 1 < len(recent)) else 0
+
+            if used + tokens + reserve > budget and verbatim:
+                break
+
+            verbatim.insert(0, text)
+            used += tokens
+
+        overflow = recent[:len(recent) - len(verbatim)]
+
+        # 2. 이전 턴: 캐시된 요약 + 아직 요약되지 않은 턴은 질문만 (extractive)
+        summary_text, source = '', 'none'
+        if summary is not None:
+            self.summary_hits += 1
+            summary_text, source = summary.text + '\n', 'cache'
+        if uncovered or overflow:
+            summary_text += self._extractive(uncovered + overflow)
+            source = 'extractive' if summary is None else source
+        if summary_text:
+            summary_text = SUMMARY_HEADER + self.truncate(summary_text, max(0, min(self.summary_tokens, budget - used))) + '\n'
+
+        text = HISTORY_HEADER + summary_text + ''.join(verbatim)
+        tokens = self.count(text)
+        self.history_tokens_total += tokens
+
+        return HistoryContext(
+            text = text,
+            tokens = tokens,
+            verbatim_turns = len(verbatim),
+            summarized_turns = len(turns) - len(verbatim) - dropped,
+            dropped_turns = dropped,
+            summary_source = source
+        )
+
+    def record_prompt(self, prompt_tokens: int):
+        self.prompt_tokens_total += prompt_tokens
+        self.prompt_tokens_max = max(self.prompt_tokens_max, prompt_tokens)
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'avg_history_tokens': round(self.history_tokens_total / self.requests, 1) if self.requests else 0.0,
+            'avg_prompt_tokens': round(self.prompt_tokens_total / self.requests, 1) if self.requests else 0.0,
+            'max_prompt_tokens': self.prompt_tokens_max,
+            'token_budget': self.token_budget,
+            'summary_hits': self.summary_hits,
+            'summaries_generated': self.summaries_generated,
+            'summary_failures': self.summary_failures,
+            'cached_summaries': len(self._summaries),
+            'dropped_turns': self.dropped_turns
+        }
+
+    async def aclose(self):
+        for task in list(self._pending.values()):
+            task.cancel()
+        await asyncio.gather(*self._pending.values(), return_exceptions = True)
@@ -0,0 +1,302 @@
+"""
+Incremental Vectorstore Ingestion Pipeline
+
+- '.txt' 파일을 하나씩 읽어 chunk 분할 (전체 파일을 메모리에 올리지 않음)
+- chunk마다 content hash(file_name + page_content) 계산
+    - 기존 hash : skip (재임베딩 X)
+    - 신규 hash : batch 임베딩 후 Chroma / Supabase 에 chunk 단위로 기록
+    - 사라진 hash (내용 변경 or 파일 삭제) : Chroma / Supabase 에서 삭제
+- doc_id는 Chroma metadata에서 이어서 발급 (Supabase 전체 조회 X)
+- lexical_index 지정 시 BM25 index 도 chunk 단위로 추가 / 삭제 후 persist directory 에 저장
+
+CLI: python -m app.services.ingestion --path ./data/GA_information --persist-directory ./ga_assistant_store
+"""
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from glob import glob
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+import argparse, hashlib, json, os, time
+
+# Chroma persist directory에 기록되는 ingestion 버전 파일 (Answer Cache 무효화 기준)
+INGEST_MARKER = 'ingest_version.json'
+
+@dataclass
+class IngestionReport:
+    files: int = 0
+    chunks: int = 0
+    unchanged: int = 0
+    added: int = 0
+    deleted: int = 0
+    elapsed: float = 0.0
+
+def chunk_hash(file_name: str, page_content: str) -> str:
+    """ chunk content hash (같은 내용이라도 파일이 다르면 다른 chunk) """
+    return hashlib.sha256(f"{file_name}\x00{page_content}".encode('utf-8')).hexdigest()
+
+def read_ingest_version(persist_directory: Optional[str]) -> Optional[float]:
+    """ 마지막 ingestion 시각 (marker 파일 mtime), 없으면 None """
+    if not persist_directory:
+        return None
+    try:
+        return os.stat(Path(persist_directory) / INGEST_MARKER).st_mtime
+    except FileNotFoundError:
+        return None
+
+def iter_text_files(path: str, pattern: str = '*.txt') -> Iterator[Document]:
+    """ '.txt' 파일을 하나씩 Document로 반환 (metadata: source, file_name, date) """
+    today = datetime.today().strftime("%Y-%m-%d")
+
+    for file in sorted(glob(os.path.join(path, pattern))):
+        with open(file, 'r', encoding = 'utf-8') as f:
+            page_content = f.read()
+
+        yield Document(
+            page_content = page_content,
+            metadata = {
+                'source': file,
+                'file_name': os.path.basename(file),
+                'date': today
+            }
+        )
+
+class IngestionPipeline:
+    """
+    - collection : Chroma collection (langchain_chroma.Chroma()._collection)
+    - embedding  : Embeddings object
+    - db         : Supabase client (None이면 Supabase 동기화 생략)
+    """
+    def __init__(
+        self,
+        collection,
+        embedding: Embeddings,
+        db = None,
+        table_name: str = 'vectorstore',
+        chunk_size: int = 500,
+        chunk_overlap: int = 100,
+        separators: Optional[List[str]] = None,
+        embed_batch_size: int = 32,
+        write_batch_size: int = 256,
+        persist_directory: Optional[str] = None,
+        lexical_index = None
+    ):
+        self.collection = collection
+        self.embedding = embedding
+        self.db = db
+        self.table_name = table_name
+        self.embed_batch_size = embed_batch_size
+        self.write_batch_size = write_batch_size
+        self.persist_directory = persist_directory
+        self.lexical_index = lexical_index
+
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size = chunk_size,
+            chunk_overlap = chunk_overlap,
+            separators = separators
+        )
+
+    def load_state(self) -> Tuple[Dict[str, Tuple[str, str, str]], int]:
+        """
+        Chroma에 저장된 chunk 상태
+        - return: ({chunk_hash: (chroma id, file_name, doc_id)}, max doc_id 번호)
+        """
+        state = {}
+        max_doc_id = 0
+        offset = 0
+
+        while True:
+            page = self.collection.get(include = ['metadatas', 'documents'], limit = self.write_batch_size, offset = offset)
+            ids = page['ids']
+
+            if not ids:
+                break
+
+            for chroma_id, metadata, document in zip(ids, page['metadatas'], page['documents']):
+                metadata = metadata or {}
+                file_name = metadata.get('file_name', '')
+                doc_id = metadata.get('doc_id', '')
+
+                # 기존(hash 없는) chunk는 내용으로 hash 계산 -> 재임베딩 없이 그대로 인정
+                key = metadata.get('chunk_hash') or chunk_hash(file_name, document or '')
+                state[key] = (chroma_id, file_name, doc_id)
+
+                if doc_id.startswith('DOC_') and doc_id[4:].isdigit():
+                    max_doc_id = max(max_doc_id, int(doc_id[4:]))
+
+            offset += len(ids)
+
+        return state, max_doc_id
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.embed_batch_size):
+            vectors.extend(self.embedding.embed_documents(texts[start:start + self.embed_batch_size]))
+        return vectors
+
+    def _flush(self, pending: List[Document]):
+        """ 신규 chunk: 임베딩 -> Chroma upsert -> Supabase insert """
+        if not pending:
+            return
+
+        vectors = self._embed([doc.page_content for doc in pending])
+
+        self.collection.upsert(
+            ids = [doc.metadata['chunk_hash'] for doc in pending],
+            embeddings = vectors,
+            documents = [doc.page_content for doc in pending],
+            metadatas = [doc.metadata for doc in pending]
+        )
+
+        if self.lexical_index is not None:
+            self.lexical_index.add([doc.metadata['chunk_hash'] for doc in pending], [doc.page_content for doc in pending])
+
+        if self.db is not None:
+            rows = [
+                {
+                    'doc_id': int(doc.metadata['doc_id'][4:]),
+                    'source': doc.metadata['source'],
+                    'file_name': doc.metadata['file_name'],
+                    'date': doc.metadata['date'],
+                    'page_content': doc.page_content
+                }
+                for doc in pending
+            ]
+            self.db.table(self.table_name).insert(rows).execute()
+
+    def _delete(self, entries: List[Tuple[str, str, str]]):
+        """ 사라진 chunk 삭제 (chunk 단위) """
+        for start in range(0, len(entries), self.write_batch_size):
+            batch = entries[start:start + self.write_batch_size]
+            self.collection.delete(ids = [chroma_id for chroma_id, _, _ in batch])
+
+            if self.lexical_index is not None:
+                self.lexical_index.remove([chroma_id for chroma_id, _, _ in batch])
+
+            if self.db is not None:
+                doc_ids = [int(doc_id[4:]) for _, _, doc_id in batch if doc_id.startswith('DOC_') and doc_id[4:].isdigit()]
+                if doc_ids:
+                    self.db.table(self.table_name).delete().in_('doc_id', doc_ids).execute()
+
+    def _mark(self, report: IngestionReport):
+        """ 변경이 있으면 ingestion marker 갱신 """
+        if not self.persist_directory or (report.added == 0 and report.deleted == 0):
+            return
+
+        with open(Path(self.persist_directory) / INGEST_MARKER, 'w', encoding = 'utf-8') as f:
+            json.dump({'version': time.time(), **asdict(report)}, f)
+
+    def run(self, docs: Iterator[Document], delete_missing: bool = True) -> IngestionReport:
+        start = time.perf_counter()
+        report = IngestionReport()
+
+        state, next_doc_id = self.load_state()
+        next_doc_id += 1
+
+        seen = set()
+        scanned_files = set()
+        pending: List[Document] = []
+
+        for doc in docs:
+            report.files += 1
+            scanned_files.add(doc.metadata['file_name'])
+
+            for chunk in self.splitter.split_documents([doc]):
+                report.chunks += 1
+                key = chunk_hash(chunk.metadata['file_name'], chunk.page_content)
+
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                if key in state:
+                    report.unchanged += 1
+                    continue
+
+                chunk.metadata['chunk_hash'] = key
+                chunk.metadata['doc_id'] = f'DOC_{next_doc_id}'
+                next_doc_id += 1
+                pending.append(chunk)
+
+                if len(pending) >= self.write_batch_size:
+                    self._flush(pending)
+                    report.added += len(pending)
+                    pending = []
+
+        self._flush(pending)
+        report.added += len(pending)
+
+        # 내용이 바뀌었거나 삭제된 파일의 chunk 제거
+        stale = [
+            entry for key, entry in state.items()
+            if key not in seen and (delete_missing or entry[1] in scanned_files)
+        ]
+        self._delete(stale)
+        report.deleted = len(stale)
+
+        # Lexical index: 변경분 저장 (index 파일이 없었다면 collection 전체와 동기화)
+        if self.lexical_index is not None:
+            added, removed = self.lexical_index.sync(self.collection)
+            if report.added or report.deleted or added or removed:
+                self.lexical_index.save()
+
+        report.elapsed = round(time.perf_counter() - start, 3)
+        self._mark(report)
+
+        return report
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Incremental vectorstore ingestion')
+    parser.add_argument('--path', required = True, help = "'.txt' 파일 디렉토리")
+    parser.add_argument('--pattern', default = '*.txt')
+    parser.add_argument('--persist-directory', default = './ga_assistant_store')
+    parser.add_argument('--collection', default = 'ga_assistant')
+    parser.add_argument('--size', type = int, default = 500)
+    parser.add_argument('--overlap', type = int, default = 100)
+    parser.add_argument('--embed-batch-size', type = int, default = 32)
+    parser.add_argument('--write-batch-size', type = int, default = 256)
+    parser.add_argument('--keep-missing', action = 'store_true', help = '삭제된 파일의 chunk 유지')
+    parser.add_argument('--no-supabase', action = 'store_true', help = 'Supabase 동기화 생략')
+    parser.add_argument('--no-lexical', action = 'store_true', help = 'BM25 lexical index 갱신 생략')
+    args = parser.parse_args()
+
+    from langchain_chroma import Chroma
+    from .model_registry import get_embedding
+    from .lexical import BM25Index, lexical_index_path
+
+    embedding = get_embedding()
+    vectorstore = Chroma(
+        embedding_function = embedding,
+        collection_name = args.collection,
+        persist_directory = args.persist_directory
+    )
+
+    db = None
+    if not args.no_supabase:
+        from ..dependency.db import connect_supabase
+        db = connect_supabase()
+
+    lexical_index = None
+    if not args.no_lexical:
+        lexical_index = BM25Index(lexical_index_path(args.persist_directory))
+        lexical_index.load()
+
+    pipeline = IngestionPipeline(
+        collection = vectorstore._collection,
+        embedding = embedding,
+        db = db,
+        chunk_size = args.size,
+        chunk_overlap = args.overlap,
+        embed_batch_size = args.embed_batch_size,
+        write_batch_size = args.write_batch_size,
+        persist_directory = args.persist_directory,
+        lexical_index = lexical_index
+    )
+
+    report = pipeline.run(iter_text_files(args.path, args.pattern), delete_missing = not args.keep_missing)
+    print(f"[Ingestion] {asdict(report)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""
+Korean Lexical Index (BM25)
+
+- Tokenizer : Kiwi 형태소 분석 (명사 / 동사·형용사 어간 / 외국어 / 숫자) + 원문의 코드·날짜 토큰 (GA-101, ISMS-P, 2024-03-01)
+- Index     : term -> {chunk id: tf} inverted index, Chroma chunk id(chunk_hash) 기준
+              ingestion 시 chunk 단위로 추가 / 삭제 (전체 재색인 X)
+- Persist   : Chroma persist directory 에 pickle snapshot (임시 파일 -> os.replace 로 원자적 교체)
+              서버는 파일 mtime 변경 시 다시 로드
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math, os, pickle, re, threading, time
+
+# Lexical Index 설정 (환경 변수)
+LEXICAL_INDEX_ENABLED = os.getenv('LEXICAL_INDEX_ENABLED', 'true').lower() == 'true'
+LEXICAL_INDEX_FILE = os.getenv('LEXICAL_INDEX_FILE', 'bm25_index.pkl')
+LEXICAL_REFRESH_INTERVAL = float(os.getenv('LEXICAL_REFRESH_INTERVAL', '30'))
+HYBRID_FETCH_K = int(os.getenv('HYBRID_FETCH_K', '10'))
+RRF_K = int(os.getenv('RRF_K', '60'))
+
+INDEX_VERSION = 1
+
+# 의미를 갖는 품사만 색인 (조사 / 어미 / 기호 제외)
+CONTENT_TAGS = ('NNG', 'NNP', 'NNB', 'NR', 'NP', 'VV', 'VA', 'XR', 'SL', 'SN', 'SH', 'MAG')
+
+# 형태소 분석에서 쪼개지는 코드 / 날짜 / 이메일 등은 원문 그대로 추가
+CODE_PATTERN = re.compile(r'[A-Za-z0-9]+(?:[-_./:@][A-Za-z0-9]+)+|\d{2,4}년|\d{1,2}월|\d{1,2}일')
+
+class KoreanTokenizer:
+    """ Kiwi 기반 BM25 tokenizer (Kiwi 모델은 최초 사용 시 1회 로드) """
+    def __init__(self, content_tags: Sequence[str] = CONTENT_TAGS):
+        self.content_tags = tuple(content_tags)
+        self._kiwi = None
+        self._lock = threading.Lock()
+
+    @property
+    def kiwi(self):
+        if self._kiwi is None:
+            with self._lock:
+                if self._kiwi is None:
+                    from kiwipiepy import Kiwi
+                    self._kiwi = Kiwi()
+        return self._kiwi
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = [token.form.lower() for token in self.kiwi.tokenize(text) if token.tag.startswith(self.content_tags)]
+        tokens.extend(match.lower() for match in CODE_PATTERN.findall(text))
+        return tokens
+
+    def tokenize_many(self, texts: Sequence[str]) -> List[List[str]]:
+        return [self.tokenize(text) for text in texts]
+
+_tokenizer: Optional[KoreanTokenizer] = None
+
+def get_tokenizer() -> KoreanTokenizer:
+    global _tokenizer
+
+    if _tokenizer is None:
+        _tokenizer = KoreanTokenizer()
+
+    return _tokenizer
+
+class BM25Index:
+    """
+    Incremental BM25 (Okapi) Inverted Index
+    - add(ids, texts) / remove(ids) : chunk 단위 갱신
+    - search(query, k)             : query term 의 posting 만 순회 (전체 문서 scoring X)
+    """
+    def __init__(self, path: Optional[str] = None, tokenizer: Optional[KoreanTokenizer] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = Path(path) if path else None
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.k1 = k1
+        self.b = b
+
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}      # chunk id -> 고유 term (삭제 시 posting 정리용)
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+        self._mtime: Optional[float] = None
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.doc_lengths
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self.doc_lengths)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str]):
+        """ chunk 추가 (같은 id가 있으면 교체) """
+        token_lists = self.tokenizer.tokenize_many(texts)
+
+        with self._lock:
+            for chunk_id, tokens in zip(ids, token_lists):
+                if chunk_id in self.doc_lengths:
+                    self._remove(chunk_id)
+
+                counts = Counter(tokens)
+                for term, tf in counts.items():
+                    self.postings.setdefault(term, {})[chunk_id] = tf
+
+                self.doc_terms[chunk_id] = tuple(counts)
+                self.doc_lengths[chunk_id] = len(tokens)
+                self.total_length += len(tokens)
+
+    def _remove(self, chunk_id: str):
+        for term in self.doc_terms.pop(chunk_id, ()):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(chunk_id, None)
+                if not posting:
+                    del self.postings[term]
+
+        self.total_length -= self.doc_lengths.pop(chunk_id, 0)
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            for chunk_id in ids:
+                self._remove(chunk_id)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """ return: [(chunk id, bm25 score)] score 내림차순 """
+        terms = Counter(self.tokenizer.tokenize(query))
+
+        with self._lock:
+            n = len(self.doc_lengths)
+            if n == 0 or not terms:
+                return []
+
+            avg_length = self.total_length / n
+            scores: Dict[str, float] = {}
+
+            for term, query_tf in terms.items():
+                posting = self.postings.get(term)
+                if not posting:
+                    continue
+
+                idf = math.log((n - len(posting) + 0.5) / (len(posting) + 0.5) + 1.0)
+                for chunk_id, tf in posting.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[chunk_id] / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + query_tf * idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key = lambda item: item[1], reverse = True)[:k]
+
+    def sync(self, collection, batch_size: int = 256) -> Tuple[int, int]:
+        """
+        Chroma collection 과 id 기준 동기화 (index 파일이 없거나 ingestion 밖에서 변경된 경우)
+        - return: (추가된 chunk 수, 삭제된 chunk 수)
+        """
+        collection_ids = set()
+        offset = 0
+        while True:
+            page = collection.get(include = [], limit = batch_size, offset = offset)
+            if not page['ids']:
+                break
+            collection_ids.update(page['ids'])
+            offset += len(page['ids'])
+
+        missing = [chunk_id for chunk_id in collection_ids if chunk_id not in self.doc_lengths]
+        stale = [chunk_id for chunk_id in self.doc_lengths if chunk_id not in collection_ids]
+
+        for start in range(0, len(missing), batch_size):
+            page = collection.get(ids = missing[start:start + batch_size], include = ['documents'])
+            self.add(page['ids'], [document or '' for document in page['documents']])
+
+        self.remove(stale)
+
+        return len(missing), len(stale)
+
+    def save(self):
+        """ 원자적 저장 (읽는 쪽은 항상 완전한 파일을 봄) """
+        if self.path is None:
+            return
+
+        with self._lock:
+            state = {
+                'version': INDEX_VERSION,
+                'k1': self.k1,
+                'b': self.b,
+                'postings': self.postings,
+                'doc_terms': self.doc_terms,
+                'doc_lengths': self.doc_lengths,
+                'total_length': self.total_length
+            }
+            payload = pickle.dumps(state, protocol = pickle.HIGHEST_PROTOCOL)
+
+        self.path.parent.mkdir(parents = True, exist_ok = True)
+        temp_path = self.path.with_suffix(self.path.suffix + f'.{os.getpid()}.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        self._mtime = os.stat(self.path).st_mtime
+
+    def load(self) -> bool:
+        """ 저장된 index 로드, 파일이 없거나 버전이 다르면 False """
+        if self.path is None or not self.path.exists():
+            return False
+
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, 'rb') as f:
+            state = pickle.load(f)
+
+        if state.get('version') != INDEX_VERSION:
+            return False
+
+        with self._lock:
+            self.k1, self.b = state['k1'], state['b']
+            self.postings = state['postings']
+            self.doc_terms = state['doc_terms']
+            self.doc_lengths = state['doc_lengths']
+            self.total_length = state['total_length']
+            self._mtime = mtime
+
+        return True
+
+    def refresh(self, interval: float = LEXICAL_REFRESH_INTERVAL) -> bool:
+        """ 다른 프로세스(ingestion)가 index 파일을 갱신한 경우 다시 로드 (interval 마다 mtime 확인) """
+        now = time.monotonic()
+        if self.path is None or now - self._last_check < interval:
+            return False
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return False
+
+        if mtime == self._mtime:
+            return False
+
+        return self.load()
+
+def lexical_index_path(persist_directory: str) -> str:
+    return str(Path(persist_directory) / LEXICAL_INDEX_FILE)
+
+def open_lexical_index(persist_directory: str, collection = None) -> BM25Index:
+    """ persist directory 의 index 로드 -> collection 과 동기화 (변경 시 저장) """
+    index = BM25Index(lexical_index_path(persist_directory))
+    index.load()
+
+    if collection is not None:
+        added, removed = index.sync(collection)
+        if added or removed or not Path(index.path).exists():
+            print(f"[Lexical Index] synced with collection: +{added} / -{removed}")
+            index.save()
+
+    return index
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60, weights: Optional[Sequence[float]] = None) -> List[Tuple[str, float]]:
+    """ RRF: score(d) = Σ weight / (k + rank), rank는 1부터 """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+
+    for ranking, weight in zip(rankings, weights):
+        for rank, item in enumerate(ranking, start = 1):
+            scores[item] = scores.get(item, 0.0) + weight / (k + rank)
+
+    return sorted(scores.items(), key = lambda item: item[1], reverse = True)
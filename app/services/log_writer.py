@@ -0,0 +1,191 @@
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+from .tracing import stage
+import asyncio, json, os, time
+
+# Chat Log Writer 설정 (환경 변수)
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '100'))
+LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', '1.0'))
+LOG_SPILL_PATH = os.getenv('LOG_SPILL_PATH', 'logs/chat_logs.spill.jsonl')
+LOG_REPLAY_INTERVAL = float(os.getenv('LOG_REPLAY_INTERVAL', '30'))
+
+class ChatLogWriter:
+    """
+    Non-blocking Chat Log Writer
+    - route는 enqueue만 수행 (DB 왕복 대기 X)
+    - worker가 batch_size 도달 or flush_interval 경과 시 bulk insert
+    - Supabase 실패 시 local append-only 파일(JSONL)에 기록 후 replay_interval 마다 재전송
+    - 종료 시 큐에 남은 로그 drain
+    """
+    def __init__(
+        self,
+        client_factory: Callable[[], Awaitable],
+        table_name: str = 'chat_logs',
+        max_queue: int = LOG_QUEUE_SIZE,
+        batch_size: int = LOG_BATCH_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL,
+        spill_path: str = LOG_SPILL_PATH,
+        replay_interval: float = LOG_REPLAY_INTERVAL
+    ):
+        self.client_factory = client_factory
+        self.table_name = table_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path)
+        self.replay_interval = replay_interval
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize = max_queue)
+        self._worker: Optional[asyncio.Task] = None
+        self._last_replay = 0.0
+
+        # Flush metrics
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.last_flush_seconds = 0.0
+
+    def enqueue(self, record: dict) -> bool:
+        """ 큐가 가득 찬 경우 바로 spill 파일에 기록 """
+        try:
+            self._queue.put_nowait(record)
+            self.enqueued += 1
+            return True
+        except asyncio.QueueFull:
+            self._spill([record])
+            return False
+
+    async def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """ Server Down >> 남은 로그 flush (timeout 초과분은 spill) """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+
+        for start in range(0, len(remaining), self.batch_size):
+            batch = remaining[start:start + self.batch_size]
+            try:
+                await asyncio.wait_for(self._insert(batch), timeout)
+                self.written += len(batch)
+            except Exception as e:
+                print(f"[Log Writer] Drain Error: {e}")
+                self._spill(batch)
+
+    async def _collect(self) -> List[dict]:
+        """ batch_size 도달 or flush_interval 경과까지 수집 """
+        loop = asyncio.get_running_loop()
+
+        # 유휴 상태에서도 replay가 돌도록 첫 로그는 replay_interval 까지만 대기
+        try:
+            batch = [await asyncio.wait_for(self._queue.get(), self.replay_interval)]
+        except asyncio.TimeoutError:
+            return []
+
+        deadline = loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        await self._replay()
+
+        while True:
+            batch = await self._collect()
+            if batch:
+                await self._flush(batch)
+
+            if time.monotonic() - self._last_replay >= self.replay_interval:
+                await self._replay()
+
+    async def _insert(self, rows: List[dict]):
+        db = await self.client_factory()
+        await db.from_(self.table_name).insert(rows).execute()
+
+    async def _flush(self, batch: List[dict]) -> bool:
+        start = time.perf_counter()
+
+        try:
+            with stage('log_insert'):
+                await self._insert(batch)
+        except Exception as e:
+            print(f"[Log Writer] Insert Error ({len(batch)} rows -> spill): {e}")
+            self.failed_flushes += 1
+            self._spill(batch)
+            return False
+
+        self.flushes += 1
+        self.written += len(batch)
+        self.last_flush_seconds = round(time.perf_counter() - start, 5)
+
+        return True
+
+    def _spill(self, rows: List[dict]):
+        """ Append-only JSONL """
+        self.spill_path.parent.mkdir(parents = True, exist_ok = True)
+
+        with open(self.spill_path, 'a', encoding = 'utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii = False) + '\n')
+
+        self.spilled += len(rows)
+
+    async def _replay(self):
+        """ spill 파일 재전송 (rename 후 처리 -> 처리 중 새로 spill 되는 로그와 분리) """
+        self._last_replay = time.monotonic()
+
+        if not self.spill_path.exists():
+            return
+
+        replay_path = self.spill_path.with_suffix('.replay')
+        if not replay_path.exists():
+            os.replace(self.spill_path, replay_path)
+
+        with open(replay_path, 'r', encoding = 'utf-8') as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                await self._insert(batch)
+            except Exception as e:
+                print(f"[Log Writer] Replay Error: {e}")
+                self._spill(rows[start:])
+                break
+            self.replayed += len(batch)
+            self.written += len(batch)
+
+        os.remove(replay_path)
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': self._queue.qsize(),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'last_flush_seconds': self.last_flush_seconds
+        }
@@ -0,0 +1,103 @@
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Iterable, Optional
+import asyncio, threading, time
+
+EMBEDDING_MODEL_NAME = 'FronyAI/frony-embed-large-ko-v1'
+RERANKER_MODEL_NAME = 'BAAI/bge-reranker-v2-m3'
+
+@dataclass
+class ModelStatus:
+    """ status: pending | lazy | loading | loaded | failed """
+    status: str = 'pending'
+    load_time: Optional[float] = None
+    error: Optional[str] = None
+
+class ModelRegistry:
+    """
+    모델 인스턴스 / 로드 상태 관리
+    - 같은 이름의 모델은 프로세스당 1회만 로드 (router 간 공유)
+    - 서버 시작 시 병렬 로드(aload) 또는 최초 사용 시 lazy 로드(load)
+    """
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._status: Dict[str, ModelStatus] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def register(self, name: str, lazy: bool = False):
+        """ readiness 조회 대상으로 등록 """
+        with self._guard:
+            self._status.setdefault(name, ModelStatus(status = 'lazy' if lazy else 'pending'))
+            self._locks.setdefault(name, threading.Lock())
+
+    def load(self, name: str, factory: Callable[[], Any]) -> Any:
+        """ 로드된 인스턴스 반환, 없으면 factory로 로드 (thread-safe) """
+        if name in self._models:
+            return self._models[name]
+
+        self.register(name)
+
+        with self._locks[name]:
+            if name in self._models:
+                return self._models[name]
+
+            status = self._status[name]
+            status.status = 'loading'
+            start = time.perf_counter()
+
+            try:
+                model = factory()
+            except Exception as e:
+                status.status = 'failed'
+                status.error = str(e)
+                print(f"[Model Registry] {name} load Error: {e}")
+                raise
+
+            status.status = 'loaded'
+            status.load_time = round(time.perf_counter() - start, 3)
+            status.error = None
+            self._models[name] = model
+            print(f"[Model Registry] {name} loaded ({status.load_time}s)")
+
+            return model
+
+    async def aload(self, name: str, factory: Callable[[], Any]) -> Any:
+        """ event loop를 막지 않고 스레드에서 로드 (asyncio.gather로 병렬 로드) """
+        self.register(name)
+        return await asyncio.to_thread(self.load, name, factory)
+
+    def get(self, name: str) -> Optional[Any]:
+        return self._models.get(name)
+
+    def set(self, name: str, model: Any):
+        """ 직접 생성한 객체 등록 (ex. 조립된 RAG chain) """
+        self.register(name)
+        self._models[name] = model
+        self._status[name].status = 'loaded'
+
+    def is_ready(self, names: Iterable[str]) -> bool:
+        return all(name in self._models for name in names)
+
+    def status(self) -> Dict[str, dict]:
+        return {name: asdict(status) for name, status in self._status.items()}
+
+# Process 공용 Registry
+registry = ModelRegistry()
+
+def get_cross_encoder():
+    """ 공용 Cross Encoder (rerank / metrics 공유) """
+    from .model_runtime import load_cross_encoder
+    return registry.load('cross_encoder', lambda: load_cross_encoder(RERANKER_MODEL_NAME))
+
+def get_embedding():
+    """ 공용 Embedding model (EMBEDDING_CACHE_ENABLED: 디스크 캐시 wrapper 적용) """
+    from .model_runtime import load_embedding
+    from .embedding_cache import EMBEDDING_CACHE_ENABLED, CachedEmbeddings, EmbeddingStore
+
+    def factory():
+        embedding = load_embedding(EMBEDDING_MODEL_NAME, normalize = True)
+        if not EMBEDDING_CACHE_ENABLED:
+            return embedding
+        return CachedEmbeddings(embedding, EmbeddingStore(), model_name = EMBEDDING_MODEL_NAME, normalize = True)
+
+    return registry.load('embedding', factory)
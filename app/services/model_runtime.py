@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+from langchain_huggingface import HuggingFaceEmbeddings
+import os
+
+# Model Runtime 설정 (환경 변수)
+# - MODEL_DEVICE       : auto | cpu | mps | cuda
+# - MODEL_NUM_THREADS  : CPU 연산 스레드 수 (0: torch 기본값)
+# - *_BACKEND          : torch | torch-int8 | onnx | onnx-int8
+# - ONNX_QUANTIZATION  : onnx-int8 양자화 타겟 (arm64 | avx2 | avx512 | avx512_vnni)
+# - ONNX_CACHE_DIR     : 양자화된 ONNX 모델 저장 위치
+BACKENDS = ('torch', 'torch-int8', 'onnx', 'onnx-int8')
+
+@dataclass
+class ModelRuntimeConfig:
+    """ Embedding / Cross Encoder 실행 환경 설정 """
+    device: str = 'auto'
+    num_threads: int = 0
+    embedding_backend: str = 'torch'
+    reranker_backend: str = 'torch'
+    onnx_quantization: str = 'avx2'
+    onnx_cache_dir: str = 'model_cache/onnx'
+
+    @classmethod
+    def from_env(cls) -> 'ModelRuntimeConfig':
+        return cls(
+            device = os.getenv('MODEL_DEVICE', 'auto'),
+            num_threads = int(os.getenv('MODEL_NUM_THREADS', '0')),
+            embedding_backend = os.getenv('EMBEDDING_BACKEND', 'torch'),
+            reranker_backend = os.getenv('RERANKER_BACKEND', 'torch'),
+            onnx_quantization = os.getenv('ONNX_QUANTIZATION', 'avx2'),
+            onnx_cache_dir = os.getenv('ONNX_CACHE_DIR', 'model_cache/onnx')
+        )
+
+def detect_device(device: str = 'auto') -> str:
+    """ auto: cuda > mps > cpu """
+    if device != 'auto':
+        return device
+
+    import torch
+
+    if torch.cuda.is_available():
+        return 'cuda'
+    if getattr(torch.backends, 'mps', None) is not None and torch.backends.mps.is_available():
+        return 'mps'
+
+    return 'cpu'
+
+def configure_threads(num_threads: int):
+    """ torch / ONNX Runtime CPU 스레드 수 설정 """
+    if num_threads <= 0:
+        return
+
+    # ONNX Runtime, MKL 등은 환경 변수로 스레드 수를 읽음
+    os.environ['OMP_NUM_THREADS'] = str(num_threads)
+
+    import torch
+    torch.set_num_threads(num_threads)
+
+def _resolve(config: ModelRuntimeConfig, backend: str) -> str:
+    """ backend 검증 후 실행 device 반환 (int8 / onnx 는 CPU 전용) """
+    if backend not in BACKENDS:
+        raise ValueError(f"Invalid backend: {backend} (choose from {BACKENDS})")
+
+    device = detect_device(config.device)
+
+    if backend != 'torch' and device == 'mps':
+        print(f"[Model Runtime] '{backend}' is not supported on mps, fallback to cpu")
+        return 'cpu'
+
+    if backend == 'torch-int8':
+        return 'cpu'
+
+    return device
+
+def _quantize_torch(module):
+    """ Linear layer dynamic int8 quantization (CPU) """
+    import torch
+    torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype = torch.qint8, inplace = True)
+
+def _onnx_int8_path(config: ModelRuntimeConfig, model_name: str, model_class) -> Path:
+    """ ONNX export + dynamic int8 양자화 (최초 1회, 이후 캐시 사용) """
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    save_dir = Path(config.onnx_cache_dir) / model_name.replace('/', '__')
+    file_name = f'model_qint8_{config.onnx_quantization}.onnx'
+
+    if not (save_dir / 'onnx' / file_name).exists():
+        print(f"[Model Runtime] Export int8 ONNX: {model_name} -> {save_dir}")
+        model = model_class(model_name, backend = 'onnx', device = 'cpu')
+        model.save_pretrained(str(save_dir))
+        export_dynamic_quantized_onnx_model(model, config.onnx_quantization, str(save_dir))
+
+    return save_dir
+
+def load_embedding(model_name: str, config: Optional[ModelRuntimeConfig] = None, normalize: bool = True) -> HuggingFaceEmbeddings:
+    """ Embedding model load (backend / device 설정 반영) """
+    config = config or ModelRuntimeConfig.from_env()
+    backend = config.embedding_backend
+    device = _resolve(config, backend)
+
+    model_kwargs = {'device': device}
+    model_path = model_name
+
+    if backend == 'onnx':
+        model_kwargs['backend'] = 'onnx'
+    elif backend == 'onnx-int8':
+        from sentence_transformers import SentenceTransformer
+        model_path = str(_onnx_int8_path(config, model_name, SentenceTransformer))
+        model_kwargs['backend'] = 'onnx'
+        model_kwargs['model_kwargs'] = {'file_name': f'onnx/model_qint8_{config.onnx_quantization}.onnx'}
+
+    embedding = HuggingFaceEmbeddings(
+        model_name = model_path,
+        model_kwargs = model_kwargs,
+        encode_kwargs = {'normalize_embeddings': normalize}
+    )
+
+    if backend == 'torch-int8':
+        _quantize_torch(embedding._client)
+
+    print(f"[Model Runtime] Embedding: {model_name} (backend={backend}, device={device})")
+
+    return embedding
+
+def load_cross_encoder(model_name: str, config: Optional[ModelRuntimeConfig] = None) -> HuggingFaceCrossEncoder:
+    """ Cross Encoder load (backend / device 설정 반영) """
+    config = config or ModelRuntimeConfig.from_env()
+    backend = config.reranker_backend
+    device = _resolve(config, backend)
+
+    model_kwargs = {'device': device}
+    model_path = model_name
+
+    if backend == 'onnx':
+        model_kwargs['backend'] = 'onnx'
+    elif backend == 'onnx-int8':
+        from sentence_transformers import CrossEncoder
+        model_path = str(_onnx_int8_path(config, model_name, CrossEncoder))
+        model_kwargs['backend'] = 'onnx'
+        model_kwargs['model_kwargs'] = {'file_name': f'onnx/model_qint8_{config.onnx_quantization}.onnx'}
+
+    cross_encoder = HuggingFaceCrossEncoder(model_name = model_path, model_kwargs = model_kwargs)
+
+    if backend == 'torch-int8':
+        _quantize_torch(cross_encoder.client)
+
+    print(f"[Model Runtime] Cross Encoder: {model_name} (backend={backend}, device={device})")
+
+    return cross_encoder
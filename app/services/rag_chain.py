@@ -0,0 +1,77 @@
+from operator import itemgetter
+from pathlib import Path
+from typing import Optional, Union
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.output_parsers import StrOutputParser
+import os
+
+def format_docs(docs):
+    """ Merge List in string """
+    return '\n\n'.join([doc.page_content for doc in docs])
+
+class PromptLoader:
+    """
+    Prompt file -> ChatPromptTemplate
+    - 파일의 mtime이 바뀐 경우에만 다시 읽고 compile (Hot-reload)
+    """
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        self._mtime: Optional[float] = None
+        self._prompt: Optional[ChatPromptTemplate] = None
+
+    def get(self) -> ChatPromptTemplate:
+        """ Return compiled prompt (reload if file changed) """
+        try:
+            mtime = os.stat(self.file_path).st_mtime
+        except FileNotFoundError:
+            print(f"Error: {self.file_path} not found")
+            if self._prompt is None:
+                raise
+            return self._prompt
+
+        if self._prompt is None or mtime != self._mtime:
+            with open(self.file_path, 'r', encoding = 'utf-8') as f:
+                prompt_text = f.read()    # Load Prompt Text
+
+            self._prompt = ChatPromptTemplate.from_template(prompt_text)
+            self._mtime = mtime
+            print(f"[Prompt] Loaded: {self.file_path.name}")
+
+        return self._prompt
+
+    def format(self, inputs: dict) -> PromptValue:
+        return self.get().invoke(inputs)
+
+    async def aformat(self, inputs: dict) -> PromptValue:
+        return self.get().invoke(inputs)
+
+    def as_runnable(self) -> Runnable:
+        return RunnableLambda(self.format, afunc = self.aformat)
+
+def build_generation_chain(llm, prompt_loader: PromptLoader) -> Runnable:
+    """
+    prompt -> llm Chain (검색이 끝난 context를 입력으로 받음)
+    - input: {'history_context': str, 'context': str, 'user_input': str}
+    """
+    return prompt_loader.as_runnable() | llm | StrOutputParser()
+
+def build_rag_chain(llm, retriever, prompt_loader: PromptLoader) -> Runnable:
+    """
+    retriever -> prompt -> llm LCEL Chain (서버 시작 시 1회 생성)
+    - input: {'input_text': str, 'history_context': str}
+    """
+    retriever_chain = itemgetter('input_text') | retriever | format_docs
+
+    rag_chain = (
+        # key: llm_context.txt variables, value: value
+        {
+            'history_context': itemgetter('history_context'),
+            'context': retriever_chain,
+            'user_input': itemgetter('input_text')
+        }
+        | build_generation_chain(llm, prompt_loader)
+    )
+
+    return rag_chain
@@ -0,0 +1,67 @@
+from typing import Optional
+import asyncio, time
+
+class TokenBucket:
+    """
+    Async Token Bucket
+    - capacity 만큼 즉시 사용 가능, 이후 rate_per_minute 속도로 충전
+    - acquire(amount): 토큰이 충분해질 때까지 asyncio.sleep (event loop를 막지 않음)
+    """
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        # capacity보다 큰 요청은 capacity 만큼만 요구 (영원히 대기 방지)
+        amount = min(amount, self.capacity)
+
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+class RateLimiter:
+    """ RPM(요청 수) / TPM(토큰 수) 동시 제한, None 이면 해당 제한 없음 """
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    async def acquire(self, requests: int = 1, tokens: int = 0):
+        if self.requests is not None:
+            await self.requests.acquire(requests)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+_encoders = {}
+
+def get_encoder(encoding: str = 'cl100k_base'):
+    """ tiktoken encoder (encoding 별 1회 로드), 없으면 None """
+    if encoding not in _encoders:
+        try:
+            import tiktoken
+            _encoders[encoding] = tiktoken.get_encoding(encoding)
+        except Exception:
+            _encoders[encoding] = None
+
+    return _encoders[encoding]
+
+def count_tokens(text: str, encoding: str = 'cl100k_base') -> int:
+    """ tiktoken 기준 토큰 수, 없으면 문자 수 기반 추정 """
+    encoder = get_encoder(encoding)
+
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special = ()))
+
+    # 한국어는 대략 2글자당 1토큰
+    return max(1, len(text) // 2)
@@ -0,0 +1,162 @@
+from concurrent.futures import Executor
+from typing import List, Optional, Sequence, Tuple
+from langchain_community.cross_encoders import BaseCrossEncoder
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import BaseDocumentCompressor, Document
+from pydantic import ConfigDict, PrivateAttr
+import asyncio, operator, os
+
+# Micro-batching 설정 (환경 변수)
+RERANK_MAX_BATCH_SIZE = int(os.getenv('RERANK_MAX_BATCH_SIZE', '32'))   # 한 번의 predict에 넣을 최대 pair 수
+RERANK_MAX_WAIT_MS = float(os.getenv('RERANK_MAX_WAIT_MS', '5'))         # 배치를 채우기 위해 기다리는 최대 시간
+RERANK_MAX_INFLIGHT = int(os.getenv('RERANK_MAX_INFLIGHT', '1'))         # 동시에 실행되는 predict 수
+
+class BatchedCrossEncoderReranker(BaseDocumentCompressor):
+    """
+    Dynamic Micro-batching Cross Encoder Reranker (CrossEncoderReranker drop-in)
+    - 동시 요청들의 (query, doc) pair를 모아 max_batch_size / max_wait_ms 기준으로 한 번에 predict
+    - 결과는 각 요청으로 다시 분배
+    - async 경로(acompress_documents)에서만 배치, sync 경로는 단건 predict
+    """
+    model: BaseCrossEncoder
+    top_n: int = 3
+    max_batch_size: int = RERANK_MAX_BATCH_SIZE
+    max_wait_ms: float = RERANK_MAX_WAIT_MS
+    max_inflight: int = RERANK_MAX_INFLIGHT
+    executor: Optional[Executor] = None    # None: event loop 기본 executor
+
+    model_config = ConfigDict(arbitrary_types_allowed = True, extra = 'forbid')
+
+    _queue: Optional[asyncio.Queue] = PrivateAttr(default = None)
+    _worker: Optional[asyncio.Task] = PrivateAttr(default = None)
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default = None)
+    _slots: Optional[asyncio.Semaphore] = PrivateAttr(default = None)
+    _running: set = PrivateAttr(default_factory = set)
+    _batches: int = PrivateAttr(default = 0)
+    _pairs: int = PrivateAttr(default = 0)
+
+    def _select(self, documents: Sequence[Document], scores: Sequence[float]) -> Sequence[Document]:
+        """ Score 내림차순 top_n """
+        docs_with_scores = list(zip(documents, scores))
+        result = sorted(docs_with_scores, key = operator.itemgetter(1), reverse = True)
+        return [doc for doc, _ in result[:self.top_n]]
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None
+    ) -> Sequence[Document]:
+        if not documents:
+            return []
+
+        scores = self.model.score([(query, doc.page_content) for doc in documents])
+
+        return self._select(documents, scores)
+
+    async def acompress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Optional[Callbacks] = None
+    ) -> Sequence[Document]:
+        if not documents:
+            return []
+
+        scores = await self.ascore([(query, doc.page_content) for doc in documents])
+
+        return self._select(documents, scores)
+
+    async def ascore(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """ pair를 배치 큐에 넣고 결과를 기다림 """
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+
+        future = loop.create_future()
+        await self._queue.put((pairs, future))
+
+        return await future
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop):
+        """ 현재 event loop에 batch worker가 없으면 생성 """
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self._worker = loop.create_task(self._batch_loop())
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+
+            # predict 실행 슬롯을 기다리는 동안 큐에 pair가 쌓임 -> 부하가 클수록 배치가 커짐
+            await self._slots.acquire()
+
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait_ms / 1000
+
+            # 배치 채우기: max_batch_size 도달 or max_wait_ms 경과
+            while size < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+
+                batch.append(item)
+                size += len(item[0])
+
+            task = loop.create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: list):
+        """ predict 1회 실행 후 결과 분배 """
+        loop = asyncio.get_running_loop()
+        all_pairs = [pair for pairs, _ in batch for pair in pairs]
+
+        try:
+            scores = await loop.run_in_executor(self.executor, self.model.score, all_pairs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        self._batches += 1
+        self._pairs += len(all_pairs)
+
+        # 결과 분배
+        offset = 0
+        for pairs, future in batch:
+            if not future.done():
+                future.set_result(list(scores[offset:offset + len(pairs)]))
+            offset += len(pairs)
+
+    async def aclose(self):
+        """ Server Down >> batch worker 종료 """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            'batches': self._batches,
+            'pairs': self._pairs,
+            'mean_batch_size': round(self._pairs / self._batches, 3) if self._batches else 0.0
+        }
@@ -0,0 +1,150 @@
+from typing import Any, List, Optional, Tuple
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import BaseDocumentCompressor, Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables.config import run_in_executor
+from .lexical import reciprocal_rank_fusion
+from .tracing import record_documents, stage
+import numpy as np
+
+class EmbeddingReuseRetriever(BaseRetriever):
+    """
+    Query embedding 1회 계산 후 모든 단계에서 재사용하는 Retriever
+    (Chroma retriever -> Cross Encoder rerank -> EmbeddingsFilter 대체)
+
+    1. Query embedding (1회)
+    2. Chroma query: include = ['embeddings'] 로 저장된 문서 벡터를 함께 조회
+    3. Re-rank (Cross Encoder)
+    4. Similarity filter: 저장된 문서 벡터로 cosine similarity 계산 (문서 재임베딩 X)
+
+    Hybrid (lexical_index 지정 시)
+    - Dense top fetch_k + BM25 top fetch_k -> Reciprocal Rank Fusion -> 상위 k 만 Re-rank
+    - BM25 에만 걸린 chunk는 Chroma get(ids) 으로 문서 / 저장 벡터 조회
+    """
+    vectorstore: Any                                        # langchain_chroma.Chroma
+    embedding: Embeddings
+    k: int = 3
+    re_ranker: Optional[BaseDocumentCompressor] = None
+    similarity_threshold: Optional[float] = 0.3
+    lexical_index: Any = None                               # lexical.BM25Index
+    fetch_k: int = 10
+    rrf_k: int = 60
+
+    def _query(self, query_vector: List[float], n_results: Optional[int] = None) -> Tuple[List[Document], np.ndarray]:
+        """ Chroma query -> (documents, stored document vectors) """
+        results = self.vectorstore._collection.query(
+            query_embeddings = [query_vector],
+            n_results = n_results or self.k,
+            include = ['documents', 'metadatas', 'embeddings']
+        )
+
+        docs = [
+            Document(page_content = content, metadata = metadata or {}, id = doc_id)
+            for content, metadata, doc_id in zip(results['documents'][0], results['metadatas'][0], results['ids'][0])
+        ]
+        vectors = np.asarray(results['embeddings'][0], dtype = np.float32)
+
+        return docs, vectors
+
+    def _get(self, ids: List[str]) -> Tuple[List[Document], np.ndarray]:
+        """ Chroma get(ids) -> (documents, stored document vectors) """
+        results = self.vectorstore._collection.get(ids = ids, include = ['documents', 'metadatas', 'embeddings'])
+
+        docs = [
+            Document(page_content = content, metadata = metadata or {}, id = doc_id)
+            for content, metadata, doc_id in zip(results['documents'], results['metadatas'], results['ids'])
+        ]
+        vectors = np.asarray(results['embeddings'], dtype = np.float32)
+
+        return docs, vectors
+
+    def _search(self, query: str, query_vector: List[float]) -> Tuple[List[Document], np.ndarray]:
+        """ Dense 검색 (+ lexical_index 지정 시 BM25 / RRF) """
+        if self.lexical_index is None:
+            with stage('vector_search'):
+                docs, vectors = self._query(query_vector)
+            record_documents('vector_search', len(docs))
+            return docs, vectors
+
+        with stage('vector_search'):
+            dense_docs, dense_vectors = self._query(query_vector, max(self.fetch_k, self.k))
+        record_documents('vector_search', len(dense_docs))
+
+        with stage('lexical_search'):
+            self.lexical_index.refresh()
+            lexical_hits = self.lexical_index.search(query, max(self.fetch_k, self.k))
+        record_documents('lexical_search', len(lexical_hits))
+
+        fused = reciprocal_rank_fusion([[doc.id for doc in dense_docs], [chunk_id for chunk_id, _ in lexical_hits]], k = self.rrf_k)
+        fused_ids = [chunk_id for chunk_id, _ in fused[:self.k]]
+
+        by_id = {doc.id: (doc, vector) for doc, vector in zip(dense_docs, dense_vectors)}
+        missing = [chunk_id for chunk_id in fused_ids if chunk_id not in by_id]
+        if missing:
+            with stage('lexical_fetch'):
+                lexical_docs, lexical_vectors = self._get(missing)
+            by_id.update({doc.id: (doc, vector) for doc, vector in zip(lexical_docs, lexical_vectors)})
+
+        # index 와 collection 이 잠시 어긋난 경우(삭제 직후 등) 없는 id는 제외
+        entries = [by_id[chunk_id] for chunk_id in fused_ids if chunk_id in by_id]
+        record_documents('fusion', len(entries))
+
+        if not entries:
+            return [], np.empty((0, 0), dtype = np.float32)
+
+        return [doc for doc, _ in entries], np.stack([vector for _, vector in entries])
+
+    def _filter(self, docs: List[Document], vectors: np.ndarray, reranked: List[Document], query_vector: List[float]) -> List[Document]:
+        """ 저장된 문서 벡터 기반 similarity threshold 필터 """
+        if self.similarity_threshold is None or not reranked:
+            return list(reranked)
+
+        query = np.asarray(query_vector, dtype = np.float32)
+        similarities = (vectors @ query) / (np.linalg.norm(vectors, axis = 1) * np.linalg.norm(query) + 1e-12)
+        similarity_by_id = {doc.id: float(score) for doc, score in zip(docs, similarities)}
+
+        return [doc for doc in reranked if similarity_by_id.get(doc.id, 0.0) >= self.similarity_threshold]
+
+    def _filtered(self, docs: List[Document], vectors: np.ndarray, reranked: List[Document], query_vector: List[float]) -> List[Document]:
+        record_documents('rerank', len(reranked))
+
+        with stage('similarity_filter'):
+            filtered = self._filter(docs, vectors, reranked, query_vector)
+        record_documents('similarity_filter', len(filtered))
+
+        return filtered
+
+    def retrieve(self, query: str) -> Tuple[List[Document], List[float]]:
+        """ return: (documents, query_vector) """
+        with stage('embed_query'):
+            query_vector = self.embedding.embed_query(query)
+        docs, vectors = self._search(query, query_vector)
+
+        if not docs:
+            return [], query_vector
+
+        with stage('rerank'):
+            reranked = self.re_ranker.compress_documents(docs, query) if self.re_ranker is not None else docs
+
+        return self._filtered(docs, vectors, list(reranked), query_vector), query_vector
+
+    async def aretrieve(self, query: str) -> Tuple[List[Document], List[float]]:
+        """ return: (documents, query_vector) - Semantic Answer Cache 등에서 query_vector 재사용 """
+        with stage('embed_query'):
+            query_vector = await self.embedding.aembed_query(query)
+        docs, vectors = await run_in_executor(None, self._search, query, query_vector)
+
+        if not docs:
+            return [], query_vector
+
+        with stage('rerank'):
+            reranked = await self.re_ranker.acompress_documents(docs, query) if self.re_ranker is not None else docs
+
+        return self._filtered(docs, vectors, list(reranked), query_vector), query_vector
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.retrieve(query)[0]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return (await self.aretrieve(query))[0]
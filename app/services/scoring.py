@@ -0,0 +1,178 @@
+"""
+Batch Metric Scoring
+- N개의 (label, prediction) 쌍을 한 번에 계산
+- Cross Encoder : predict 1회 (batch_size 단위로 모델 내부 배치)
+- ROUGE         : 텍스트별 토큰화 / n-gram 캐시 + bit-parallel LCS (단건은 캐시된 RougeScorer)
+- MRR           : doc_id(없으면 page_content hash) 기준, NumPy 배열 비교
+"""
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import hashlib
+import numpy as np
+
+VALID_ROUGE_TYPES = ('rouge1', 'rouge2', 'rougeL')
+
+def embedding_distances(embedding, labels: Sequence[str], predictions: Sequence[str]) -> np.ndarray:
+    """ Cosine distance (1 - cosine similarity), embed_documents 1회 호출 """
+    if not labels:
+        return np.empty(0, dtype = np.float32)
+
+    vectors = np.asarray(embedding.embed_documents(list(labels) + list(predictions)), dtype = np.float32)
+    label_vectors, predict_vectors = vectors[:len(labels)], vectors[len(labels):]
+
+    similarities = np.sum(label_vectors * predict_vectors, axis = 1) / (
+        np.linalg.norm(label_vectors, axis = 1) * np.linalg.norm(predict_vectors, axis = 1) + 1e-12
+    )
+
+    return 1.0 - similarities
+
+def cross_encoder_scores(cross_encoder, labels: Sequence[str], predictions: Sequence[str], batch_size: int = 64) -> np.ndarray:
+    """ Cross Encoder score, predict 1회 호출 """
+    if not labels:
+        return np.empty(0, dtype = np.float32)
+
+    pairs = list(zip(labels, predictions))
+
+    # HuggingFaceCrossEncoder: sentence-transformers CrossEncoder.predict에 batch_size 전달
+    client = getattr(cross_encoder, 'client', None)
+    if client is not None and hasattr(client, 'predict'):
+        scores = np.asarray(client.predict(pairs, batch_size = batch_size, show_progress_bar = False), dtype = np.float32)
+    else:
+        scores = np.asarray(list(cross_encoder.score(pairs)), dtype = np.float32)
+
+    # (N, 2) 출력 모델은 relevant score 사용
+    if scores.ndim > 1:
+        scores = scores[:, 1]
+
+    return scores
+
+class _CachedTokenizer:
+    """ 같은 텍스트의 토큰화(+stemming) 결과 재사용 """
+    def __init__(self, use_stemmer: bool = True, maxsize: int = 65536):
+        from korouge_score import tokenizers
+
+        self._tokenizer = tokenizers.DefaultTokenizer(use_stemmer)
+        self.tokenize = lru_cache(maxsize = maxsize)(self._tokenize)
+
+    def _tokenize(self, text: str) -> Tuple[str, ...]:
+        return tuple(self._tokenizer.tokenize(text))
+
+@lru_cache(maxsize = 1)
+def _get_tokenizer() -> _CachedTokenizer:
+    return _CachedTokenizer(use_stemmer = True)
+
+@lru_cache(maxsize = 8)
+def get_rouge_scorer(rouge_types: Tuple[str, ...]):
+    """ rouge_types 조합별 RougeScorer 1개 (토큰화 캐시 공유) """
+    from korouge_score import rouge_scorer
+
+    return rouge_scorer.RougeScorer(list(rouge_types), tokenizer = _get_tokenizer())
+
+def validate_rouge_types(rouge_types: Sequence[str]) -> Tuple[str, ...]:
+    rouge_types = tuple(rouge_type for rouge_type in rouge_types if rouge_type in VALID_ROUGE_TYPES)
+
+    if not rouge_types:
+        raise ValueError("Invalid ROUGE type")
+
+    return rouge_types
+
+@lru_cache(maxsize = 65536)
+def _ngrams(text: str, n: int) -> Counter:
+    tokens = _get_tokenizer().tokenize(text)
+    return Counter(tokens[i:i + n] for i in range(len(tokens) - n + 1))
+
+@lru_cache(maxsize = 16384)
+def _match_masks(text: str) -> Dict[str, int]:
+    """ 토큰별 등장 위치 bitmask (bit-parallel LCS 용) """
+    masks: Dict[str, int] = {}
+    for i, token in enumerate(_get_tokenizer().tokenize(text)):
+        masks[token] = masks.get(token, 0) | (1 << i)
+    return masks
+
+def _lcs_length(target: str, prediction: str) -> int:
+    """ Bit-parallel LCS 길이 (O(N*M/w), korouge의 DP table과 같은 결과) """
+    masks = _match_masks(target)
+    length = len(_get_tokenizer().tokenize(target))
+    full = (1 << length) - 1
+
+    v = full
+    for token in _get_tokenizer().tokenize(prediction):
+        u = v & masks.get(token, 0)
+        v = ((v + u) | (v - u)) & full
+
+    return length - bin(v).count('1')
+
+def _score(overlap: int, target_count: int, prediction_count: int) -> Tuple[float, float, float]:
+    from korouge_score.scoring import fmeasure
+
+    precision = overlap / max(prediction_count, 1)
+    recall = overlap / max(target_count, 1)
+
+    return precision, recall, fmeasure(precision, recall)
+
+def rouge_scores(labels: Sequence[str], predictions: Sequence[str], rouge_types: Sequence[str] = VALID_ROUGE_TYPES, measure: str = 'fmeasure') -> Dict[str, np.ndarray]:
+    """
+    Rouge (precision / recall / fmeasure 중 measure)
+    - 토큰 / n-gram / LCS bitmask 를 텍스트별로 캐시 (반복되는 label은 1회만 계산)
+    - 결과는 RougeScorer(use_stemmer = True).score 와 동일
+    """
+    rouge_types = validate_rouge_types(rouge_types)
+    index = ('precision', 'recall', 'fmeasure').index(measure)
+    tokenize = _get_tokenizer().tokenize
+    results = {rouge_type: np.zeros(len(labels), dtype = np.float32) for rouge_type in rouge_types}
+
+    for i, (label, predict) in enumerate(zip(labels, predictions)):
+        for rouge_type in rouge_types:
+            if rouge_type == 'rougeL':
+                target_count, prediction_count = len(tokenize(label)), len(tokenize(predict))
+                if not target_count or not prediction_count:
+                    continue
+                scores = _score(_lcs_length(label, predict), target_count, prediction_count)
+            else:
+                n = int(rouge_type[5:])
+                target_ngrams, prediction_ngrams = _ngrams(label, n), _ngrams(predict, n)
+                overlap = sum((target_ngrams & prediction_ngrams).values())
+                scores = _score(overlap, sum(target_ngrams.values()), sum(prediction_ngrams.values()))
+
+            results[rouge_type][i] = scores[index]
+
+    return results
+
+def document_mrr_scores(labels: Sequence, predicts: Sequence[Sequence]) -> np.ndarray:
+    """ Document 기준 MRR: 모든 문서에 doc_id가 있으면 doc_id, 아니면 page_content hash로 비교 """
+    def doc_ids(docs):
+        return [(doc.metadata or {}).get('doc_id') for doc in docs]
+
+    label_ids = doc_ids(labels)
+    predict_ids = [doc_ids(ranked) for ranked in predicts]
+
+    if all(label_ids) and all(all(ids) for ids in predict_ids):
+        return mrr_scores(label_ids, predict_ids)
+
+    def content_hash(doc) -> str:
+        return hashlib.sha1(doc.page_content.encode('utf-8')).hexdigest()
+
+    return mrr_scores([content_hash(doc) for doc in labels], [[content_hash(doc) for doc in ranked] for ranked in predicts])
+
+def mrr_scores(label_ids: Sequence[Optional[str]], predict_ids: Sequence[Sequence[str]]) -> np.ndarray:
+    """ Reciprocal Rank (label이 없으면 0.0), (N, K) 배열 비교 """
+    n = len(label_ids)
+    k = max((len(ranked) for ranked in predict_ids), default = 0)
+
+    if n == 0 or k == 0:
+        return np.zeros(n, dtype = np.float32)
+
+    # 문자열 키를 정수 id로 변환 후 비교 (빈 칸은 -1, 없는 label은 -2)
+    vocab: Dict[str, int] = {}
+    ranked = np.full((n, k), -1, dtype = np.int64)
+    for i, ids in enumerate(predict_ids):
+        ranked[i, :len(ids)] = [vocab.setdefault(predict_id, len(vocab)) for predict_id in ids]
+
+    labels = np.array([vocab.get(label_id, -2) if label_id is not None else -2 for label_id in label_ids], dtype = np.int64)
+
+    hits = ranked == labels[:, None]
+    found = hits.any(axis = 1)
+    first_rank = hits.argmax(axis = 1) + 1
+
+    return np.where(found, 1.0 / first_rank, 0.0).astype(np.float32)
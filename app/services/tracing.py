@@ -0,0 +1,255 @@
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+import os, threading, time
+
+# Tracing 설정 (환경 변수)
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50)
+
+class Histogram:
+    """ Prometheus histogram (label 값 조합별 bucket 누적) """
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}   # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+
+        for labels, values in sorted(series.items()):
+            label_text = ','.join(f'{name}="{value}"' for name, value in zip(self.labelnames, labels))
+            prefix = label_text + ',' if label_text else ''
+
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+
+            lines.append(f"{self.name}_sum{{{label_text}}} {values[-1]}")
+            lines.append(f"{self.name}_count{{{label_text}}} {cumulative}")
+
+        return lines
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+
+        with self._lock:
+            values = dict(self._values)
+
+        for labels, value in sorted(values.items()):
+            label_text = ','.join(f'{name}="{value}"' for name, value in zip(self.labelnames, labels))
+            lines.append(f"{self.name}{{{label_text}}} {value}")
+
+        return lines
+
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'HTTP request duration (until the last body chunk)', ['route', 'method', 'status'], LATENCY_BUCKETS)
+STAGE_DURATION = Histogram('rag_stage_duration_seconds', 'Duration of each RAG pipeline stage', ['stage'], LATENCY_BUCKETS)
+TOKENS = Histogram('rag_tokens', 'Tokens per request', ['kind'], TOKEN_BUCKETS)
+DOCUMENTS = Histogram('rag_documents', 'Documents remaining after each retrieval stage', ['stage'], COUNT_BUCKETS)
+ERRORS = Counter('rag_stage_errors_total', 'Errors raised inside a RAG stage', ['stage'])
+
+METRICS = [REQUEST_DURATION, STAGE_DURATION, TOKENS, DOCUMENTS, ERRORS]
+
+class RequestTrace:
+    """ 요청 1건의 stage별 소요 시간 (Server-Timing 용) """
+    __slots__ = ('started', 'stages', 'values')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.values: Dict[str, float] = {}
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.stages.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ', '.join(entries)
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar('rag_request_trace', default = None)
+_disabled = nullcontext()
+
+def current_trace() -> Optional[RequestTrace]:
+    return _trace.get()
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        ERRORS.inc(name)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_DURATION.observe(elapsed, name)
+        trace = _trace.get()
+        if trace is not None:
+            trace.add(name, elapsed)
+
+def stage(name: str):
+    """ with stage('rerank'): ... -> stage 소요 시간 기록 (비활성화 시 공유 nullcontext) """
+    return _stage(name) if TRACING_ENABLED else _disabled
+
+def record_stage(name: str, seconds: float):
+    """ 외부에서 측정한 stage 시간 기록 (callback 등) """
+    if not TRACING_ENABLED:
+        return
+
+    STAGE_DURATION.observe(seconds, name)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+def record_tokens(kind: str, count: int):
+    if TRACING_ENABLED:
+        TOKENS.observe(count, kind)
+
+def record_documents(stage_name: str, count: int):
+    if TRACING_ENABLED:
+        DOCUMENTS.observe(count, stage_name)
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    LangChain Callback -> stage 시간 / 토큰 수
+    - llm        : LLM 호출 시작 ~ 종료
+    - llm_ttft   : 첫 토큰까지 (streaming)
+    - retriever  : retriever 실행 시간, 검색 문서 수
+    run_inline: async chain에서도 executor로 보내지 않고 현재 context(요청 trace)에서 실행
+    """
+    run_inline = True
+
+    def __init__(self):
+        self._started: Dict[UUID, float] = {}
+        self._first_token: Dict[UUID, bool] = {}
+
+    def _start(self, run_id: UUID):
+        self._started[run_id] = time.perf_counter()
+
+    def _end(self, run_id: UUID) -> Optional[float]:
+        started = self._started.pop(run_id, None)
+        self._first_token.pop(run_id, None)
+        return time.perf_counter() - started if started is not None else None
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any):
+        if run_id in self._started and run_id not in self._first_token:
+            self._first_token[run_id] = True
+            record_stage('llm_ttft', time.perf_counter() - self._started[run_id])
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        elapsed = self._end(run_id)
+        if elapsed is not None:
+            record_stage('llm', elapsed)
+
+        # Ollama: generation_info 의 prompt_eval_count / eval_count
+        for generations in response.generations:
+            for generation in generations:
+                info = generation.generation_info or {}
+                if info.get('prompt_eval_count') is not None:
+                    record_tokens('llm_prompt', info['prompt_eval_count'])
+                if info.get('eval_count') is not None:
+                    record_tokens('llm_completion', info['eval_count'])
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+        ERRORS.inc('llm')
+
+    def on_retriever_start(self, serialized: Dict[str, Any], query: str, *, run_id: UUID, **kwargs: Any):
+        self._start(run_id)
+
+    def on_retriever_end(self, documents, *, run_id: UUID, **kwargs: Any):
+        elapsed = self._end(run_id)
+        if elapsed is not None:
+            record_stage('retriever', elapsed)
+        record_documents('retrieved', len(documents))
+
+    def on_retriever_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end(run_id)
+        ERRORS.inc('retriever')
+
+class TracingMiddleware:
+    """
+    ASGI Middleware (BaseHTTPMiddleware 와 달리 streaming body를 감싸지 않음)
+    - 요청별 RequestTrace 를 context 에 설정 -> stage() 기록이 요청 단위로 모임
+    - SERVER_TIMING_ENABLED : 응답 header 전송 시점까지 끝난 stage 를 Server-Timing 으로 전달
+      (streaming 응답의 LLM 생성 시간은 header 이후이므로 /metrics 에서 확인)
+    """
+    def __init__(self, app, server_timing: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if not TRACING_ENABLED or scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                if self.server_timing:
+                    message['headers'] = list(message.get('headers', [])) + [(b'server-timing', trace.server_timing().encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _trace.reset(token)
+            route = scope.get('route')
+            REQUEST_DURATION.observe(time.perf_counter() - trace.started, getattr(route, 'path', 'unmatched'), scope['method'], str(status))
+
+def render_metrics() -> str:
+    """ Prometheus text exposition format """
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
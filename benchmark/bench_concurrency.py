@@ -0,0 +1,92 @@
+"""
+RAG 요청 경로 동시성 Benchmark: sync(threadpool) vs async(asyncio)
+
+- sync  : 기존 경로 (def route + chain.invoke -> AnyIO 스레드풀 ~40개에 묶임)
+- async : 현재 경로 (async def route + chain.ainvoke)
+
+실행: python -m benchmark.bench_concurrency --requests 400 --concurrency 200 --llm-latency 0.5
+"""
+import argparse, asyncio, time
+from pathlib import Path
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from benchmark.fakes import SlowLLM, SlowRetriever, percentile
+from app.dependency.db import connect_supabase_async
+from app.routers import llm as llm_router
+from app.routers.health import require_ready
+from app.services.rag_chain import PromptLoader, build_rag_chain, build_generation_chain
+from app.services.history import HistoryManager
+
+def build_app(llm_latency: float, retriever_latency: float) -> FastAPI:
+    """ 실제 llm router + 기존 sync 경로를 재현한 route """
+    app = FastAPI()
+    app.include_router(llm_router.router)
+    app.dependency_overrides[connect_supabase_async] = lambda: None
+    app.dependency_overrides[require_ready] = lambda: None
+
+    llm = SlowLLM(latency = llm_latency)
+    retriever = SlowRetriever(latency = retriever_latency)
+    prompt_loader = PromptLoader(Path('prompt') / 'llm_context.txt')
+
+    app.state.retriever = retriever
+    app.state.prompt_loader = prompt_loader
+    app.state.history_manager = HistoryManager()
+    app.state.rag_chain = build_rag_chain(llm, retriever, prompt_loader)
+    app.state.generation_chain = build_generation_chain(llm, prompt_loader)
+    app.state.answer_cache = None   # 캐시 효과 제외, 순수 동시성만 비교
+
+    @app.post('/bench/sync')
+    def sync_route(request: Request, chat_request: llm_router.ChatRequest) -> PlainTextResponse:
+        response = request.app.state.rag_chain.invoke({
+            'input_text': chat_request.input_text,
+            'history_context': ''   # benchmark 요청은 history 없음
+        })
+        return PlainTextResponse(content = response)
+
+    return app
+
+async def run(app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    """ total 개의 요청을 concurrency 개씩 동시에 전송 """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    transport = httpx.ASGITransport(app = app)
+    async with httpx.AsyncClient(transport = transport, base_url = 'http://bench', timeout = None) as client:
+
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post(path, json = {'input_text': f'질문 {i}', 'history': []})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'rps': total / elapsed,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95)
+    }
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type = int, default = 400)
+    parser.add_argument('--concurrency', type = int, default = 200)
+    parser.add_argument('--llm-latency', type = float, default = 0.5)
+    parser.add_argument('--retriever-latency', type = float, default = 0.05)
+    args = parser.parse_args()
+
+    app = build_app(args.llm_latency, args.retriever_latency)
+
+    print(f"requests={args.requests} concurrency={args.concurrency} llm_latency={args.llm_latency}s")
+    print(f"{'path':<8}{'req/s':>10}{'p50(s)':>10}{'p95(s)':>10}")
+
+    for name, path in [('sync', '/bench/sync'), ('async', '/request/rag_model/lcel')]:
+        result = await run(app, path, args.requests, args.concurrency)
+        print(f"{name:<8}{result['rps']:>10.1f}{result['p50']:>10.3f}{result['p95']:>10.3f}")
+
+if __name__ == '__main__':
+    asyncio.run(main())
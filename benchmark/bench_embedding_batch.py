@@ -0,0 +1,49 @@
+"""
+Ollama Embedding 처리량 Benchmark: 단건 직렬 호출 vs Batch Engine
+
+- serial : 기존 texts_embedding (텍스트마다 ollama.embeddings 1회, 직렬)
+- batch  : llm.texts_embedding (embed batch API + bounded 동시 요청, generator 입력)
+
+실행: python -m benchmark.bench_embedding_batch --texts 2000
+"""
+import argparse, time
+import ollama
+from benchmark.fake_ollama import FakeOllama
+from llm import texts_embedding
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--texts', type = int, default = 2000)
+    parser.add_argument('--batch-size', type = int, default = 64)
+    parser.add_argument('--concurrency', type = int, default = 4)
+    parser.add_argument('--request-latency', type = float, default = 0.01)
+    parser.add_argument('--per-text-latency', type = float, default = 0.001)
+    args = parser.parse_args()
+
+    server = FakeOllama(request_latency = args.request_latency, per_text_latency = args.per_text_latency).start()
+    texts = [f'{i}번 문서: 총무팀 안내 문서 내용입니다.' for i in range(args.texts)]
+
+    print(f"texts={args.texts} batch_size={args.batch_size} concurrency={args.concurrency}")
+    print(f"{'method':<8}{'total(s)':>10}{'texts/s':>10}{'requests':>10}")
+
+    # serial: 기존 방식
+    client = ollama.Client(host = server.url)
+    requests_before = server.requests
+    start = time.perf_counter()
+    serial = [client.embeddings(model = 'bge-m3', prompt = text)['embedding'] for text in texts]
+    elapsed = time.perf_counter() - start
+    print(f"{'serial':<8}{elapsed:>10.2f}{len(texts) / elapsed:>10.1f}{server.requests - requests_before:>10}")
+
+    # batch: generator 입력
+    requests_before = server.requests
+    start = time.perf_counter()
+    matrix = texts_embedding((text for text in texts), batch_size = args.batch_size, max_concurrency = args.concurrency, host = server.url)
+    elapsed = time.perf_counter() - start
+    print(f"{'batch':<8}{elapsed:>10.2f}{len(texts) / elapsed:>10.1f}{server.requests - requests_before:>10}")
+
+    assert matrix.shape == (len(serial), len(serial[0])) and str(matrix.dtype) == 'float32'
+
+    server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+History Prompt 토큰 Benchmark: 최근 5턴 원문 연결 vs Token-budgeted History
+
+- concat  : 기존 방식 (최근 5턴 USER / AI Response 원문, 길이 제한 없음)
+- budget  : HistoryManager (최근 턴 원문 + 이전 턴 rolling summary, token_budget 이내)
+턴이 쌓일 때마다 history_context 토큰 수와 구성 시간을 비교 (prefill 비용의 대리 지표)
+
+실행: python -m benchmark.bench_history_budget --turns 10 --answer-chars 2000
+"""
+import argparse, asyncio, time
+from app.services.history import HistoryManager
+
+class StubSummarizer:
+    """ 요약 LLM stand-in (고정 지연 후 짧은 요약) """
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+
+    async def ainvoke(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency)
+        return '사용자는 비품 신청, 출장비 정산, 회의실 예약 절차를 문의했고 총무팀 포털 이용 방법을 안내받음.'
+
+def concat_history(history) -> str:
+    history_context = "\n\n[Previous Conversation History]\n"
+    for conv in history[-5:]:
+        history_context += f"USER: {conv.get('user', '')}\n"
+        history_context += f"AI Response: {conv.get('assistant', '')}\n\n"
+    return history_context
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--turns', type = int, default = 10)
+    parser.add_argument('--answer-chars', type = int, default = 2000)
+    parser.add_argument('--token-budget', type = int, default = 1024)
+    args = parser.parse_args()
+
+    manager = HistoryManager(llm = StubSummarizer(), token_budget = args.token_budget)
+    answer = ('총무팀 포털의 신청 메뉴에서 양식을 작성한 뒤 팀장 승인을 받으면 처리됩니다. ' * 100)[:args.answer_chars]
+
+    print(f"turns={args.turns} answer_chars={args.answer_chars} token_budget={args.token_budget} tokenizer={manager.encoding}")
+    print(f"{'turn':<6}{'concat(tok)':>13}{'budget(tok)':>13}{'build(ms)':>11}{'source':>12}")
+
+    history = []
+    for turn in range(1, args.turns + 1):
+        history.append({'user': f'{turn}번째 질문: 비품 신청은 어떻게 하나요?', 'assistant': answer})
+
+        started = time.perf_counter()
+        result = await manager.abuild(history, conversation_id = 'bench')
+        elapsed = (time.perf_counter() - started) * 1000
+
+        print(f"{turn:<6}{manager.count(concat_history(history)):>13}{result.tokens:>13}{elapsed:>11.2f}{result.summary_source:>12}")
+
+        # 다음 턴까지의 사용자 입력 / 생성 시간 동안 background 요약 완료
+        await asyncio.sleep(0.1)
+
+    print(manager.stats())
+    await manager.aclose()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Metric Scoring Benchmark: 쌍별 계산 vs Batch 계산 (기본 10k pairs)
+
+- cross_encoder : 쌍마다 score 1회 vs predict 1회 (batch_size 단위)
+- rouge         : 쌍마다 RougeScorer 생성 vs 캐시된 scorer + 토큰화 캐시
+- mrr           : page_content 문자열 비교 루프 vs doc_id NumPy 비교
+
+실행
+- stand-in 비용 모델 : python -m benchmark.bench_metric_scoring --pairs 10000
+- 실제 모델          : python -m benchmark.bench_metric_scoring --model BAAI/bge-reranker-v2-m3
+"""
+import argparse, random, time
+from korouge_score import rouge_scorer
+from langchain_core.documents import Document
+from benchmark.fakes import FakeCrossEncoder
+from app.services import scoring
+
+WORDS = ['총무팀', '비품', '신청', '포털', '메뉴', '출장', '경비', '정산', '회의실', '예약', '주차', '등록', '명함', '발급', '택배', '수령']
+
+def make_pairs(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    # 실제 평가 데이터처럼 label은 일부 문장이 반복됨
+    sentences = [' '.join(rng.choices(WORDS, k = rng.randint(8, 20))) for _ in range(max(1, n // 10))]
+    labels = [rng.choice(sentences) for _ in range(n)]
+    predicts = [' '.join(rng.sample(label.split(), k = max(1, len(label.split()) - 3))) for label in labels]
+    return labels, predicts
+
+def make_documents(n: int, k: int, seed: int = 0):
+    rng = random.Random(seed)
+    # 같은 머리말을 공유하는 chunk (문자열 비교가 끝까지 진행되는 경우)
+    corpus = ['총무팀 안내 문서 내용입니다. ' * 20 + f'{i}번 문서' for i in range(1000)]
+
+    # API 요청처럼 JSON에서 역직렬화된 별도 객체 (identity 비교 shortcut 없음)
+    def document(i: int) -> Document:
+        return Document(page_content = ''.join(list(corpus[i])), metadata = {'doc_id': f'DOC_{i}'})
+
+    labels = [document(rng.randrange(len(corpus))) for _ in range(n)]
+    predicts = [[document(i) for i in rng.sample(range(len(corpus)), k = k)] for _ in range(n)]
+    return labels, predicts
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def legacy_rouge(labels, predicts, rouge_types):
+    results = []
+    for label, predict in zip(labels, predicts):
+        scorer = rouge_scorer.RougeScorer(rouge_types, use_stemmer = True)
+        scores = scorer.score(label, predict)
+        results.append({rouge_type: scores[rouge_type].fmeasure for rouge_type in rouge_types})
+    return results
+
+def legacy_mrr(labels, predicts):
+    mrrs = []
+    for label, predict in zip(labels, predicts):
+        mrr = 0.0
+        for rank, doc in enumerate(predict, start = 1):
+            if doc.page_content == label.page_content:
+                mrr = 1 / rank
+                break
+        mrrs.append(mrr)
+    return sum(mrrs) / len(mrrs)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pairs', type = int, default = 10000)
+    parser.add_argument('--top-k', type = int, default = 10)
+    parser.add_argument('--batch-size', type = int, default = 64)
+    parser.add_argument('--model', default = None, help = 'HuggingFace cross encoder (미지정 시 stand-in 비용 모델)')
+    parser.add_argument('--cross-encoder-pairs', type = int, default = 1000, help = '쌍별 cross encoder는 느리므로 일부만 측정 후 외삽')
+    args = parser.parse_args()
+
+    rouge_types = ['rouge1', 'rouge2', 'rougeL']
+    labels, predicts = make_pairs(args.pairs)
+    label_docs, predict_docs = make_documents(args.pairs, args.top_k)
+
+    if args.model:
+        from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+        cross_encoder = HuggingFaceCrossEncoder(model_name = args.model)
+    else:
+        cross_encoder = FakeCrossEncoder(call_overhead = 0.003, pair_cost = 0.0002)
+
+    print(f"pairs={args.pairs} top_k={args.top_k} batch_size={args.batch_size}")
+    print(f"{'metric':<16}{'per-pair(s)':>14}{'batch(s)':>12}{'speedup':>10}")
+
+    # Cross Encoder: 쌍별 호출은 일부만 측정해 전체로 외삽
+    sample = min(args.cross_encoder_pairs, args.pairs)
+    elapsed, _ = timed(lambda: [list(cross_encoder.score([(label, predict)])) for label, predict in zip(labels[:sample], predicts[:sample])])
+    legacy = elapsed * args.pairs / sample
+    batch, _ = timed(lambda: scoring.cross_encoder_scores(cross_encoder, labels, predicts, args.batch_size))
+    print(f"{'cross_encoder':<16}{legacy:>14.3f}{batch:>12.3f}{legacy / batch:>9.1f}x")
+
+    # ROUGE
+    legacy, expected = timed(lambda: legacy_rouge(labels, predicts, rouge_types))
+    batch, result = timed(lambda: scoring.rouge_scores(labels, predicts, rouge_types))
+    assert all(abs(expected[i]['rougeL'] - result['rougeL'][i]) < 1e-5 for i in range(args.pairs))
+    print(f"{'rouge':<16}{legacy:>14.3f}{batch:>12.3f}{legacy / batch:>9.1f}x")
+
+    # MRR
+    legacy, expected = timed(lambda: legacy_mrr(label_docs, predict_docs))
+    batch, result = timed(lambda: scoring.document_mrr_scores(label_docs, predict_docs))
+    assert abs(expected - float(result.mean())) < 1e-5
+    print(f"{'mrr':<16}{legacy:>14.3f}{batch:>12.3f}{legacy / batch:>9.1f}x")
+
+    # MRR (doc_id 추출 이후, EvaluationRunner처럼 id만 보관한 경우)
+    label_ids = [doc.metadata['doc_id'] for doc in label_docs]
+    predict_ids = [[doc.metadata['doc_id'] for doc in ranked] for ranked in predict_docs]
+    batch, _ = timed(lambda: scoring.mrr_scores(label_ids, predict_ids))
+    print(f"{'mrr (ids)':<16}{legacy:>14.3f}{batch:>12.3f}{legacy / batch:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
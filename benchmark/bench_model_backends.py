@@ -0,0 +1,107 @@
+"""
+Embedding / Cross Encoder Backend Parity & CPU Latency Benchmark
+
+- 기준: torch fp32
+- 비교: --backends 로 지정한 backend (torch-int8, onnx, onnx-int8)
+- Parity
+    - Embedding : 기준 벡터와의 cosine similarity (mean / min)
+    - Rerank    : 기준 점수와의 max abs diff, 순위 일치율(top-1)
+- Latency: batch 단위 평균 시간, texts/s
+
+실행: python -m benchmark.bench_model_backends --device cpu --threads 4 --backends torch-int8 onnx onnx-int8
+"""
+import argparse, time
+import numpy as np
+from dataclasses import replace
+from app.services.model_runtime import ModelRuntimeConfig, configure_threads, load_embedding, load_cross_encoder
+
+EMBEDDING_MODEL = 'FronyAI/frony-embed-large-ko-v1'
+RERANKER_MODEL = 'BAAI/bge-reranker-v2-m3'
+
+QUERIES = [
+    '연차 휴가 신청은 어떻게 하나요?',
+    '교육 과정 일정은 언제 공지되나요?',
+    '사무용품 비품 신청 방법 알려주세요',
+    '법인카드 사용 후 정산 절차가 궁금합니다',
+    '회의실 예약은 어디서 하나요?',
+    '출장비 지급 기준이 어떻게 되나요?',
+    '재직증명서 발급 방법',
+    '주차 등록은 어떻게 하나요?'
+]
+
+PASSAGES = [
+    '연차 휴가는 사내 포털의 근태 메뉴에서 신청하며, 팀장 승인 후 확정됩니다.',
+    '교육 과정 일정은 매월 첫째 주 월요일에 사내 공지로 안내됩니다.',
+    '비품 신청은 총무팀 비품 신청서를 작성하여 메일로 제출합니다.',
+    '법인카드 사용 내역은 사용일로부터 7일 이내에 영수증과 함께 정산합니다.',
+    '회의실 예약은 그룹웨어 자원 예약 메뉴에서 가능합니다.',
+    '출장비는 출장 지역과 기간에 따라 사내 규정에 의해 지급됩니다.',
+    '재직증명서는 인사 시스템에서 즉시 발급 가능합니다.',
+    '주차 등록은 차량 번호와 함께 총무팀에 신청합니다.'
+]
+
+def time_call(func, repeat: int) -> float:
+    """ 평균 실행 시간 (warm-up 1회 제외) """
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--device', default = 'cpu')
+    parser.add_argument('--threads', type = int, default = 0)
+    parser.add_argument('--backends', nargs = '+', default = ['torch-int8', 'onnx', 'onnx-int8'])
+    parser.add_argument('--onnx-quantization', default = 'avx2')
+    parser.add_argument('--repeat', type = int, default = 5)
+    args = parser.parse_args()
+
+    base_config = ModelRuntimeConfig(device = args.device, num_threads = args.threads, onnx_quantization = args.onnx_quantization)
+    configure_threads(args.threads)
+
+    texts = QUERIES + PASSAGES
+    pairs = [(query, passage) for query in QUERIES for passage in PASSAGES]
+
+    # 기준: torch fp32
+    base_embedding = load_embedding(EMBEDDING_MODEL, base_config)
+    base_vectors = np.asarray(base_embedding.embed_documents(texts), dtype = np.float32)
+    base_reranker = load_cross_encoder(RERANKER_MODEL, base_config)
+    base_scores = np.asarray(base_reranker.score(pairs), dtype = np.float32).reshape(len(QUERIES), len(PASSAGES))
+
+    rows = [(
+        'torch',
+        1.0, 1.0, 0.0, 1.0,
+        time_call(lambda: base_embedding.embed_documents(texts), args.repeat),
+        time_call(lambda: base_reranker.score(pairs), args.repeat)
+    )]
+
+    for backend in args.backends:
+        config = replace(base_config, embedding_backend = backend, reranker_backend = backend)
+
+        embedding = load_embedding(EMBEDDING_MODEL, config)
+        vectors = np.asarray(embedding.embed_documents(texts), dtype = np.float32)
+        cosines = np.sum(vectors * base_vectors, axis = 1) / (np.linalg.norm(vectors, axis = 1) * np.linalg.norm(base_vectors, axis = 1))
+
+        reranker = load_cross_encoder(RERANKER_MODEL, config)
+        scores = np.asarray(reranker.score(pairs), dtype = np.float32).reshape(len(QUERIES), len(PASSAGES))
+        top1_agreement = float(np.mean(np.argmax(scores, axis = 1) == np.argmax(base_scores, axis = 1)))
+
+        rows.append((
+            backend,
+            float(cosines.mean()), float(cosines.min()),
+            float(np.abs(scores - base_scores).max()), top1_agreement,
+            time_call(lambda: embedding.embed_documents(texts), args.repeat),
+            time_call(lambda: reranker.score(pairs), args.repeat)
+        ))
+
+    print(f"device={args.device} threads={args.threads or 'default'} texts={len(texts)} pairs={len(pairs)}")
+    print(f"{'backend':<12}{'cos_mean':>10}{'cos_min':>10}{'rr_maxdiff':>12}{'rr_top1':>9}{'emb(ms)':>10}{'emb/s':>9}{'rr(ms)':>10}{'pairs/s':>9}")
+    for backend, cos_mean, cos_min, max_diff, top1, emb_time, rr_time in rows:
+        print(
+            f"{backend:<12}{cos_mean:>10.5f}{cos_min:>10.5f}{max_diff:>12.5f}{top1:>9.3f}"
+            f"{emb_time * 1000:>10.1f}{len(texts) / emb_time:>9.1f}{rr_time * 1000:>10.1f}{len(pairs) / rr_time:>9.1f}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+요청당 오버헤드 Microbenchmark (LLM 제외)
+
+- per_request : 기존 방식 (매 요청마다 prompt 파일 읽기 + from_template + chain 생성 + gc.collect)
+- prebuilt    : 현재 방식 (lifespan에서 생성한 chain 재사용, prompt는 mtime 확인만)
+
+LLM / Retriever는 지연 0의 stand-in을 사용하므로 측정값은 순수 Python 오버헤드
+실행: python -m benchmark.bench_request_overhead --iterations 500
+"""
+import argparse, gc, time
+from pathlib import Path
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_core.output_parsers import StrOutputParser
+from benchmark.fakes import SlowLLM, SlowRetriever, percentile
+from app.services.rag_chain import PromptLoader, build_rag_chain, format_docs
+
+PROMPT_PATH = Path('prompt') / 'llm_context.txt'
+
+def per_request(llm, retriever, input_text: str, history_context: str) -> str:
+    """ 기존 request_rag_lcel 본문 재현 """
+    with open(PROMPT_PATH, 'r', encoding = 'utf-8') as f:
+        loaded_prompt = f.read()
+
+    prompt = ChatPromptTemplate.from_template(loaded_prompt)
+
+    def get_input_string(x):
+        return x['input_text'] if isinstance(x, dict) else x
+
+    retriever_chain = RunnableLambda(get_input_string) | retriever | format_docs
+
+    rag_chain = (
+        {
+            'history_context': RunnableLambda(lambda x: history_context),
+            'context': retriever_chain,
+            'user_input': RunnablePassthrough()
+        }
+        | prompt
+        | llm
+        | StrOutputParser()
+    )
+
+    response = rag_chain.invoke({'input_text': input_text})
+    gc.collect()
+
+    return response
+
+def measure(func, iterations: int) -> list:
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type = int, default = 500)
+    args = parser.parse_args()
+
+    llm = SlowLLM(latency = 0.0)
+    retriever = SlowRetriever(latency = 0.0)
+    rag_chain = build_rag_chain(llm, retriever, PromptLoader(PROMPT_PATH))
+    history_context = "\n\n[Previous Conversation History]\nUSER: 안녕하세요\nAI Response: 안녕하세요!\n\n"
+
+    results = {
+        'per_request': measure(lambda i: per_request(llm, retriever, f'질문 {i}', history_context), args.iterations),
+        'prebuilt': measure(lambda i: rag_chain.invoke({'input_text': f'질문 {i}', 'history_context': history_context}), args.iterations)
+    }
+
+    print(f"iterations={args.iterations}")
+    print(f"{'path':<14}{'mean(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for name, latencies in results.items():
+        mean = sum(latencies) / len(latencies) * 1000
+        print(f"{name:<14}{mean:>10.2f}{percentile(latencies, 50) * 1000:>10.2f}{percentile(latencies, 95) * 1000:>10.2f}")
+
+if __name__ == '__main__':
+    main()
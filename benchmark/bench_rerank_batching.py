@@ -0,0 +1,81 @@
+"""
+Cross Encoder Rerank 처리량 Benchmark: 요청별 predict vs Micro-batching
+
+- per_request : 요청마다 predict 1회 (기존 CrossEncoderReranker + executor)
+- batched     : BatchedCrossEncoderReranker (동시 요청 pair를 모아 predict 1회)
+
+실행
+- stand-in 비용 모델 : python -m benchmark.bench_rerank_batching
+- 실제 모델          : python -m benchmark.bench_rerank_batching --model BAAI/bge-reranker-v2-m3
+"""
+import argparse, asyncio, time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from langchain_core.documents import Document
+from benchmark.fakes import FakeCrossEncoder, percentile
+from app.services.reranker import BatchedCrossEncoderReranker
+
+DOCS = [
+    Document(page_content = f'{i}번 문서: 총무팀 비품 신청은 사내 포털의 신청 메뉴에서 진행합니다.', metadata = {'doc_id': f'DOC_{i}'})
+    for i in range(3)
+]
+
+async def run(compress, concurrency: int, total: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await compress(DOCS, f'비품 신청 방법 {i}')
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+
+    return {'qps': total / elapsed, 'p95': percentile(latencies, 95)}
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default = None, help = 'HuggingFace cross encoder (미지정 시 stand-in 비용 모델)')
+    parser.add_argument('--queries', type = int, default = 128)
+    parser.add_argument('--workers', type = int, default = 2)
+    parser.add_argument('--max-batch-size', type = int, default = 32)
+    parser.add_argument('--max-wait-ms', type = float, default = 5)
+    args = parser.parse_args()
+
+    if args.model:
+        from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+        model = HuggingFaceCrossEncoder(model_name = args.model)
+    else:
+        model = FakeCrossEncoder()
+
+    executor = ThreadPoolExecutor(max_workers = args.workers)
+    re_ranker = BatchedCrossEncoderReranker(
+        model = model,
+        top_n = 2,
+        max_batch_size = args.max_batch_size,
+        max_wait_ms = args.max_wait_ms,
+        executor = executor
+    )
+
+    async def per_request(documents, query):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(re_ranker.compress_documents, documents, query))
+
+    print(f"queries={args.queries} workers={args.workers} max_batch_size={args.max_batch_size} max_wait_ms={args.max_wait_ms}")
+    print(f"{'concurrency':<12}{'path':<12}{'q/s':>10}{'p95(s)':>10}")
+
+    for concurrency in [1, 8, 32]:
+        for name, compress in [('per_request', per_request), ('batched', re_ranker.acompress_documents)]:
+            result = await run(compress, concurrency, args.queries)
+            print(f"{concurrency:<12}{name:<12}{result['qps']:>10.1f}{result['p95']:>10.3f}")
+
+    print(f"batched stats: {re_ranker.stats()}")
+
+    await re_ranker.aclose()
+    executor.shutdown()
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+감성분석 처리량 Benchmark: 기사별 직렬 request_sa vs Streaming Batch
+
+- serial : 기사마다 request_sa 1회 (직렬, 응답 텍스트 파싱은 호출자 몫)
+- batch  : llm.sentiment_batch (bounded 동시 요청 + JSON format + 캐시 + 즉시 기록)
+- cached : 같은 파일 재실행 (캐시 hit)
+
+실행: python -m benchmark.bench_sentiment_batch --articles 500
+"""
+import argparse, json, os, tempfile, time
+import ollama
+from benchmark.fake_ollama import FakeOllama
+from llm import parse_sentiment, request_sa, sentiment_batch
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--articles', type = int, default = 500)
+    parser.add_argument('--concurrency', type = int, default = 8)
+    parser.add_argument('--chat-latency', type = float, default = 0.05)
+    parser.add_argument('--malformed-rate', type = float, default = 0.02)
+    args = parser.parse_args()
+
+    server = FakeOllama(chat_latency = args.chat_latency, malformed_rate = args.malformed_rate).start()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'news.jsonl')
+        with open(input_path, 'w', encoding = 'utf-8') as f:
+            for i in range(args.articles):
+                f.write(json.dumps({'id': i, 'content': f'{i}번 기사: 반도체 업황 개선 기대감에 주가 상승'}, ensure_ascii = False) + '\n')
+
+        print(f"articles={args.articles} concurrency={args.concurrency} chat_latency={args.chat_latency} malformed_rate={args.malformed_rate}")
+        print(f"{'method':<8}{'total(s)':>10}{'articles/s':>12}{'parse_fail':>12}")
+
+        # serial: 기존 방식
+        client = ollama.Client(host = server.url)
+        started = time.perf_counter()
+        failures = 0
+        with open(input_path, 'r', encoding = 'utf-8') as f:
+            for line in f:
+                failures += parse_sentiment(request_sa(json.loads(line)['content'], client = client)) is None
+        elapsed = time.perf_counter() - started
+        print(f"{'serial':<8}{elapsed:>10.2f}{args.articles / elapsed:>12.1f}{failures / args.articles:>12.2%}")
+
+        # batch / cached: 같은 캐시로 2회 실행
+        cache_path = os.path.join(tmp, 'sentiment.sqlite')
+        for name in ['batch', 'cached']:
+            report = sentiment_batch(input_path, os.path.join(tmp, f'{name}.jsonl'), max_concurrency = args.concurrency, cache_path = cache_path, host = server.url)
+            print(f"{name:<8}{report['elapsed']:>10.2f}{report['articles_per_sec']:>12.1f}{report['parse_failure_rate']:>12.2%}")
+
+    server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Supabase table 전체 조회 Benchmark: offset 페이지네이션 vs keyset 스트리밍
+
+- offset           : 기존 request_table (.range(start, end) + 전체 row list 누적)
+- keyset           : iter_table (id > last_id), prefetch X
+- keyset+prefetch  : iter_table, 다음 페이지 미리 요청
+측정: 전체 소요 시간, 마지막 페이지 조회 시간, Python peak memory (tracemalloc)
+
+실행: python -m benchmark.bench_table_pagination --rows 100000
+"""
+import argparse, os, time, tracemalloc
+from benchmark.fake_postgrest import FakePostgREST
+
+COLUMNS = {'doc_id': 'INTEGER', 'source': 'TEXT', 'file_name': 'TEXT', 'date': 'TEXT', 'page_content': 'TEXT'}
+
+def offset_scan(db, table_name: str, page_size: int) -> tuple:
+    """ 기존 request_table 방식 """
+    all_data = []
+    page = 0
+    last_page_time = 0.0
+
+    while True:
+        start = time.perf_counter()
+        data = db.from_(table_name).select('*').range(page * page_size, (page + 1) * page_size - 1).execute().data
+        last_page_time = time.perf_counter() - start
+
+        all_data.extend(data)
+        if len(data) < page_size:
+            break
+        page += 1
+
+    return len(all_data), last_page_time
+
+def keyset_scan(iter_table, db, table_name: str, page_size: int, prefetch: bool) -> tuple:
+    """ iter_table 스트리밍 소비 (row를 보관하지 않음) """
+    count = 0
+    for batch in iter_table(table_name, db = db, page_size = page_size, prefetch = prefetch, as_dataframe = True):
+        count += len(batch)
+    return count, None
+
+def measure(func) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count, last_page = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, last_page, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type = int, default = 100_000)
+    parser.add_argument('--page-size', type = int, default = 1000)
+    parser.add_argument('--latency', type = float, default = 0.005, help = '요청당 네트워크 지연(초)')
+    args = parser.parse_args()
+
+    server = FakePostgREST({'vectorstore': COLUMNS}, latency = args.latency).start()
+    server.seed('vectorstore', [
+        {
+            'doc_id': i,
+            'source': f'./data/GA_information/{i % 50}.txt',
+            'file_name': f'{i % 50}.txt',
+            'date': '2025-08-01',
+            'page_content': f'{i}번 chunk: 총무팀 안내 문서 내용입니다. ' * 8
+        }
+        for i in range(1, args.rows + 1)
+    ])
+
+    # vectorstore 모듈은 import 시점에 client를 생성하므로 stand-in 주소를 먼저 지정
+    os.environ['SUPABASE_URL'] = server.url
+    os.environ.setdefault('SUPABASE_API_KEY', 'bench.bench.bench')
+    from supabase import create_client
+    from app.routers.vectorstore import iter_table
+
+    db = create_client(server.url, os.environ['SUPABASE_API_KEY'])
+
+    print(f"rows={args.rows} page_size={args.page_size} latency={args.latency}s")
+    print(f"{'method':<18}{'rows':>9}{'total(s)':>10}{'last_page(ms)':>15}{'peak_mem(MB)':>14}")
+
+    for name, func in [
+        ('offset', lambda: offset_scan(db, 'vectorstore', args.page_size)),
+        ('keyset', lambda: keyset_scan(iter_table, db, 'vectorstore', args.page_size, prefetch = False)),
+        ('keyset+prefetch', lambda: keyset_scan(iter_table, db, 'vectorstore', args.page_size, prefetch = True))
+    ]:
+        count, elapsed, last_page, peak = measure(func)
+        last_page = f"{last_page * 1000:.1f}" if last_page is not None else '-'
+        print(f"{name:<18}{count:>9}{elapsed:>10.2f}{last_page:>15}{peak / 1024 / 1024:>14.1f}")
+
+    server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Tracing 오버헤드 Benchmark: TRACING_ENABLED on / off
+
+LLM / Retriever 지연을 0으로 두고 요청 경로 자체의 비용만 비교
+- off : middleware / stage() 모두 pass-through
+- on  : stage 기록 + histogram + callback (+ Server-Timing header)
+
+실행: python -m benchmark.bench_tracing_overhead --requests 2000
+"""
+import argparse, asyncio, time
+from pathlib import Path
+import httpx
+from fastapi import FastAPI
+from benchmark.fakes import SlowLLM, SlowRetriever, percentile
+from app.dependency.db import connect_supabase_async
+from app.routers import llm as llm_router, monitoring
+from app.routers.health import require_ready
+from app.services import tracing
+from app.services.history import HistoryManager
+from app.services.rag_chain import PromptLoader, build_generation_chain
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware, server_timing = True)
+    app.include_router(llm_router.router)
+    app.include_router(monitoring.router)
+    app.dependency_overrides[connect_supabase_async] = lambda: None
+    app.dependency_overrides[require_ready] = lambda: None
+
+    prompt_loader = PromptLoader(Path('prompt') / 'llm_context.txt')
+
+    app.state.retriever = SlowRetriever(latency = 0)
+    app.state.prompt_loader = prompt_loader
+    app.state.history_manager = HistoryManager()
+    app.state.generation_chain = build_generation_chain(SlowLLM(latency = 0), prompt_loader).with_config(callbacks = [tracing.TracingCallbackHandler()])
+    app.state.answer_cache = None
+
+    return app
+
+async def run(app: FastAPI, total: int) -> dict:
+    latencies = []
+    transport = httpx.ASGITransport(app = app)
+
+    async with httpx.AsyncClient(transport = transport, base_url = 'http://bench', timeout = None) as client:
+        for i in range(total):
+            start = time.perf_counter()
+            response = await client.post('/request/rag_model/lcel', json = {'input_text': f'질문 {i}', 'history': []})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+        server_timing = response.headers.get('server-timing')
+        metrics = (await client.get('/metrics')).text
+
+    return {'mean': sum(latencies) / total, 'p95': percentile(latencies, 95), 'server_timing': server_timing, 'metrics': metrics}
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type = int, default = 2000)
+    args = parser.parse_args()
+
+    app = build_app()
+    await run(app, 50)   # warm-up
+
+    print(f"requests={args.requests}")
+    print(f"{'tracing':<8}{'mean(ms)':>10}{'p95(ms)':>10}")
+
+    results = {}
+    for enabled in [False, True, False, True]:
+        tracing.TRACING_ENABLED = enabled
+        result = await run(app, args.requests)
+        results[enabled] = result
+        print(f"{'on' if enabled else 'off':<8}{result['mean'] * 1000:>10.3f}{result['p95'] * 1000:>10.3f}")
+
+    print(f"\nServer-Timing: {results[True]['server_timing']}")
+    print('\n'.join(line for line in results[True]['metrics'].splitlines() if line.startswith('rag_stage_duration_seconds_count')))
+
+if __name__ == '__main__':
+    asyncio.run(main())
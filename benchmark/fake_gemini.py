@@ -0,0 +1,114 @@
+"""
+Local Gemini API Stand-in
+
+- POST /v1beta/models/{model}:generateContent        : 단건 응답
+- POST /v1beta/models/{model}:streamGenerateContent  : SSE 스트리밍 (alt=sse)
+요청당 고정 지연, 동시 요청 수가 rate_limit_concurrency 를 넘으면 429 (Retry-After) 응답
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import json, threading, time
+
+class FakeGemini:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.05, chunks: int = 4, rate_limit_concurrency: Optional[int] = None, retry_after: float = 0.05):
+        self.latency = latency
+        self.chunks = chunks
+        self.rate_limit_concurrency = rate_limit_concurrency
+        self.retry_after = retry_after
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeGemini':
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, body: dict) -> str:
+        contents = body.get('contents') or [{}]
+        text = ''.join(part.get('text', '') for part in contents[-1].get('parts', []))
+        return f"[{body.get('generationConfig', {}).get('temperature')}] {text[:50]} 에 대한 답변입니다."
+
+    def _handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: Optional[dict] = None):
+                payload = json.dumps(body, ensure_ascii = False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+
+                with store._lock:
+                    store.requests += 1
+                    if store.rate_limit_concurrency is not None and store.in_flight >= store.rate_limit_concurrency:
+                        store.rate_limited += 1
+                        limited = True
+                    else:
+                        store.in_flight += 1
+                        store.max_in_flight = max(store.max_in_flight, store.in_flight)
+                        limited = False
+
+                if limited:
+                    self._send(429, {'error': {'code': 429, 'message': 'Resource has been exhausted'}}, {'Retry-After': str(store.retry_after)})
+                    return
+
+                try:
+                    answer = store.answer(body)
+
+                    if ':streamGenerateContent' in self.path:
+                        self.send_response(200)
+                        self.send_header('Content-Type', 'text/event-stream')
+                        self.send_header('Connection', 'close')
+                        self.end_headers()
+
+                        size = max(1, len(answer) // store.chunks + 1)
+                        for i in range(0, len(answer), size):
+                            time.sleep(store.latency / store.chunks)
+                            chunk = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': answer[i:i + size]}]}}]}
+                            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii = False)}\r\n\r\n".encode('utf-8'))
+                            self.wfile.flush()
+                        self.close_connection = True
+
+                    elif ':generateContent' in self.path:
+                        time.sleep(store.latency)
+                        self._send(200, {
+                            'candidates': [{'content': {'role': 'model', 'parts': [{'text': answer}]}, 'finishReason': 'STOP'}],
+                            'usageMetadata': {'totalTokenCount': len(answer)}
+                        })
+
+                    else:
+                        self._send(404, {'error': {'code': 404, 'message': f'unknown path {self.path}'}})
+                finally:
+                    with store._lock:
+                        store.in_flight -= 1
+
+        return Handler
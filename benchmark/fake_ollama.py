@@ -0,0 +1,101 @@
+"""
+Local Ollama Stand-in
+
+- POST /api/embeddings : 단건 임베딩 (prompt)
+- POST /api/embed      : batch 임베딩 (input: str | list)
+- POST /api/chat       : 감성분석 JSON 응답 (malformed_rate 비율로 형식이 깨진 응답)
+요청당 고정 지연 + 텍스트당 비용으로 실제 서버의 처리 특성을 재현
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import hashlib, json, random, threading, time
+
+class FakeOllama:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, dim: int = 1024, request_latency: float = 0.01, per_text_latency: float = 0.001, chat_latency: float = 0.05, malformed_rate: float = 0.0):
+        self.dim = dim
+        self.chat_latency = chat_latency
+        self.malformed_rate = malformed_rate
+        self.request_latency = request_latency
+        self.per_text_latency = per_text_latency
+        self.requests = 0
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakeOllama':
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def vector(self, text: str) -> list:
+        """ 텍스트마다 고정된 의사 임베딩 """
+        seed = hashlib.sha256(text.encode('utf-8')).digest()
+        return [((seed[i % len(seed)] + i) % 255) / 255 for i in range(self.dim)]
+
+    def sentiment(self, text: str) -> str:
+        """ 텍스트마다 고정된 감성분석 응답 (일부는 형식 오류) """
+        seed = hashlib.sha256(text.encode('utf-8')).digest()
+        if random.random() < self.malformed_rate:
+            return '감성분석 결과: 긍정적인 기사입니다.'
+        positive = round(seed[0] / 255, 2)
+        return json.dumps({'positive': positive, 'negative': round(1 - positive, 2)})
+
+    def _handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _read(self) -> dict:
+                length = int(self.headers.get('Content-Length', 0))
+                return json.loads(self.rfile.read(length) or b'{}')
+
+            def _send(self, status: int, body: dict):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                store.requests += 1
+                body = self._read()
+
+                if self.path == '/api/embeddings':
+                    time.sleep(store.request_latency + store.per_text_latency)
+                    self._send(200, {'embedding': store.vector(body.get('prompt', ''))})
+
+                elif self.path == '/api/embed':
+                    texts = body.get('input', [])
+                    texts = [texts] if isinstance(texts, str) else texts
+                    time.sleep(store.request_latency + store.per_text_latency * len(texts))
+                    self._send(200, {'model': body.get('model', ''), 'embeddings': [store.vector(text) for text in texts]})
+
+                elif self.path == '/api/chat':
+                    time.sleep(store.chat_latency)
+                    messages = body.get('messages', [])
+                    content = store.sentiment(messages[-1]['content'] if messages else '')
+                    self._send(200, {
+                        'model': body.get('model', ''),
+                        'created_at': '2025-01-01T00:00:00Z',
+                        'message': {'role': 'assistant', 'content': content},
+                        'done': True
+                    })
+
+                else:
+                    self._send(404, {'error': f'unknown path {self.path}'})
+
+        return Handler
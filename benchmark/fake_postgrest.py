@@ -0,0 +1,149 @@
+"""
+Local PostgREST Stand-in (SQLite)
+
+supabase-py / postgrest-py 가 사용하는 요청 형태만 지원
+- GET    /rest/v1/<table>?select=a,b&order=id.asc&id=gt.10&limit=100&offset=200
+- POST   /rest/v1/<table>   (JSON object or list -> insert)
+- DELETE /rest/v1/<table>?doc_id=in.(1,2,3)
+
+SQLite의 OFFSET 역시 건너뛴 row를 모두 읽으므로 offset 페이지네이션의 비용 특성이 재현됨
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlparse
+import json, re, sqlite3, threading, time
+
+OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+class FakePostgREST:
+    """
+    - tables : {table_name: {column: sqlite type}} ('id' INTEGER PRIMARY KEY 자동 추가)
+    - latency : 요청당 추가 지연 (네트워크 왕복 재현)
+    """
+    def __init__(self, tables: Dict[str, Dict[str, str]], host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(':memory:', check_same_thread = False)
+        self.requests = 0
+
+        for table, columns in tables.items():
+            ddl = ', '.join(f"{name} {dtype}" for name, dtype in columns.items())
+            self.conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY AUTOINCREMENT, {ddl})")
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FakePostgREST':
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def seed(self, table: str, rows: List[dict]):
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        with self.lock:
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                [tuple(row[col] for col in columns) for row in rows]
+            )
+            self.conn.commit()
+
+    def count(self, table: str) -> int:
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    @staticmethod
+    def _where(params: List[tuple]) -> tuple:
+        clauses, values = [], []
+        for column, expression in params:
+            if column in ('select', 'order', 'limit', 'offset', 'columns') or not IDENTIFIER.match(column):
+                continue
+            operator, _, value = expression.partition('.')
+            if operator == 'in':
+                items = [item.strip('"') for item in value.strip('()').split(',') if item]
+                clauses.append(f"{column} IN ({', '.join('?' for _ in items)})")
+                values.extend(items)
+            elif operator in OPERATORS:
+                clauses.append(f"{column} {OPERATORS[operator]} ?")
+                values.append(value)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', values
+
+    def _handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _table(self) -> Optional[str]:
+                path = urlparse(self.path).path
+                match = re.match(r'^/rest/v1/([A-Za-z_][A-Za-z0-9_]*)$', path)
+                return match.group(1) if match else None
+
+            def _send(self, status: int, body = None):
+                payload = json.dumps(body if body is not None else []).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                store.requests += 1
+                if store.latency:
+                    time.sleep(store.latency)
+
+                table = self._table()
+                params = parse_qsl(urlparse(self.path).query)
+                options = dict(params)
+
+                columns = options.get('select', '*')
+                columns = '*' if columns == '*' else ', '.join(col for col in columns.split(',') if IDENTIFIER.match(col))
+
+                where, values = store._where(params)
+                sql = f"SELECT {columns} FROM {table}{where}"
+
+                if 'order' in options:
+                    column, _, direction = options['order'].partition('.')
+                    sql += f" ORDER BY {column} {'DESC' if direction.startswith('desc') else 'ASC'}"
+                sql += f" LIMIT {int(options.get('limit', -1))} OFFSET {int(options.get('offset', 0))}"
+
+                with store.lock:
+                    cursor = store.conn.execute(sql, values)
+                    names = [description[0] for description in cursor.description]
+                    rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+
+                self._send(200, rows)
+
+            def do_POST(self):
+                store.requests += 1
+                if store.latency:
+                    time.sleep(store.latency)
+
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'[]')
+                rows = body if isinstance(body, list) else [body]
+                store.seed(self._table(), rows)
+                self._send(201, rows)
+
+            def do_DELETE(self):
+                store.requests += 1
+                table = self._table()
+                where, values = store._where(parse_qsl(urlparse(self.path).query))
+                with store.lock:
+                    store.conn.execute(f"DELETE FROM {table}{where}", values)
+                    store.conn.commit()
+                self._send(200, [])
+
+        return Handler
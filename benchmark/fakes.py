@@ -0,0 +1,155 @@
+"""
+Benchmark 공용 Stand-in 객체
+- 실제 Ollama / Chroma / Supabase 없이 지연 시간만 재현
+"""
+import asyncio, hashlib, os, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from langchain_core.callbacks import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
+from langchain_community.cross_encoders import BaseCrossEncoder
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.llms import LLM
+from langchain_core.retrievers import BaseRetriever
+
+# app.dependency.db 는 import 시점에 Supabase client를 생성하므로 더미 값 지정
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:54321')
+os.environ.setdefault('SUPABASE_API_KEY', 'bench.bench.bench')
+
+class SlowLLM(LLM):
+    """ 고정 지연 후 응답하는 LLM (sync: time.sleep / async: asyncio.sleep) """
+    latency: float = 0.5
+    response: str = '요약: 벤치마크 응답입니다.'
+
+    @property
+    def _llm_type(self) -> str:
+        return 'slow-fake'
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        time.sleep(self.latency)
+        return self.response
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        await asyncio.sleep(self.latency)
+        return self.response
+
+class SlowRetriever(BaseRetriever):
+    """ 고정 지연 후 문서를 반환하는 Retriever (EmbeddingReuseRetriever 인터페이스) """
+    latency: float = 0.05
+    docs: List[Document] = [
+        Document(page_content = '총무팀 운영 시간은 09:00 ~ 18:00 입니다.', metadata = {'doc_id': 'DOC_1'}),
+        Document(page_content = '교육 과정 일정은 매월 첫째 주에 공지됩니다.', metadata = {'doc_id': 'DOC_2'})
+    ]
+
+    query_vector: List[float] = [1.0, 0.0, 0.0]
+
+    def retrieve(self, query: str) -> Tuple[List[Document], List[float]]:
+        time.sleep(self.latency)
+        return self.docs, self.query_vector
+
+    async def aretrieve(self, query: str) -> Tuple[List[Document], List[float]]:
+        await asyncio.sleep(self.latency)
+        return self.docs, self.query_vector
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.retrieve(query)[0]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return (await self.aretrieve(query))[0]
+
+class FakeCrossEncoder(BaseCrossEncoder):
+    """
+    CPU Cross Encoder 비용 모델: predict 1회당 고정 오버헤드 + pair당 비용
+    (time.sleep은 GIL을 놓으므로 실제 모델보다 낙관적인 병렬성을 가정)
+    """
+    def __init__(self, call_overhead: float = 0.03, pair_cost: float = 0.004):
+        self.call_overhead = call_overhead
+        self.pair_cost = pair_cost
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        time.sleep(self.call_overhead + self.pair_cost * len(text_pairs))
+        return [float(len(doc) % 7) for _, doc in text_pairs]
+
+class HashingEmbedding(Embeddings):
+    """ 문자 bigram hashing 임베딩 (모델 다운로드 없이 결정적인 벡터) """
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        import numpy as np
+
+        vector = np.zeros(self.dim, dtype = np.float32)
+        compact = text.replace(' ', '')
+        for i in range(len(compact) - 1):
+            digest = hashlib.md5(compact[i:i + 2].encode('utf-8')).digest()
+            vector[int.from_bytes(digest[:4], 'little') % self.dim] += 1.0
+        return (vector / (np.linalg.norm(vector) + 1e-12)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+class FakeCollection:
+    """ Chroma collection 의 get / query / upsert / delete 만 구현한 in-memory 대체 (brute-force cosine) """
+    def __init__(self):
+        self._rows: Dict[str, Tuple[str, dict, List[float]]] = {}
+
+    def count(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, ids: Sequence[str], embeddings: Sequence[List[float]], documents: Sequence[str], metadatas: Sequence[dict]):
+        for chunk_id, vector, document, metadata in zip(ids, embeddings, documents, metadatas):
+            self._rows[chunk_id] = (document, dict(metadata), list(vector))
+
+    add = upsert
+
+    def delete(self, ids: Sequence[str]):
+        for chunk_id in ids:
+            self._rows.pop(chunk_id, None)
+
+    def _result(self, ids: List[str], include: Sequence[str]) -> dict:
+        result = {'ids': ids}
+        if 'documents' in include:
+            result['documents'] = [self._rows[chunk_id][0] for chunk_id in ids]
+        if 'metadatas' in include:
+            result['metadatas'] = [self._rows[chunk_id][1] for chunk_id in ids]
+        if 'embeddings' in include:
+            result['embeddings'] = [self._rows[chunk_id][2] for chunk_id in ids]
+        return result
+
+    def get(self, ids: Optional[Sequence[str]] = None, include: Sequence[str] = ('documents', 'metadatas'), limit: Optional[int] = None, offset: int = 0) -> dict:
+        if ids is None:
+            keys = list(self._rows)[offset:None if limit is None else offset + limit]
+        else:
+            keys = [chunk_id for chunk_id in ids if chunk_id in self._rows]
+        return self._result(keys, include)
+
+    def query(self, query_embeddings: Sequence[List[float]], n_results: int = 10, include: Sequence[str] = ('documents', 'metadatas')) -> dict:
+        import numpy as np
+
+        keys = list(self._rows)
+        matrix = np.asarray([self._rows[chunk_id][2] for chunk_id in keys], dtype = np.float32)
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'embeddings': []}
+
+        for query_vector in query_embeddings:
+            scores = matrix @ np.asarray(query_vector, dtype = np.float32) if len(keys) else np.empty(0)
+            top = [keys[i] for i in np.argsort(-scores)[:n_results]]
+            for name, values in self._result(top, include).items():
+                results[name].append(values)
+
+        return {name: values for name, values in results.items() if values}
+
+class FakeVectorstore:
+    """ EmbeddingReuseRetriever 는 vectorstore._collection 만 사용 """
+    def __init__(self, collection: FakeCollection):
+        self._collection = collection
+
+def percentile(values: List[float], q: float) -> float:
+    """ q: 0 ~ 100 """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
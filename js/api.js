@@ -1,4 +1,16 @@
-export async function getChatResponse(messageText, history) {
+// 대화 식별자: 서버의 이전 대화 요약 캐시 key (페이지 로드 시 히스토리와 함께 초기화)
+const CONVERSATION_ID = (window.crypto && crypto.randomUUID)
+    ? crypto.randomUUID()
+    : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+
+/**
+ * 챗봇 응답을 스트리밍으로 받아옵니다.
+ * @param {string} messageText 사용자 입력
+ * @param {Array} history 대화 히스토리
+ * @param {function(string): void} [onToken] 토큰 수신 시 누적된 응답 텍스트로 호출되는 콜백
+ * @returns {Promise<string>} 전체 응답 텍스트
+ */
+export async function getChatResponse(messageText, history, onToken) {
     console.log('=== 함수 시작 디버깅 ===');
     console.log('messageText:', messageText);
     console.log('history parameter:', history);
@@ -16,7 +28,8 @@ export async function getChatResponse(messageText, history) {
 
     const chatData = {
         input_text: messageText,
-        history: history || []
+        history: history || [],
+        conversation_id: CONVERSATION_ID
     };
 
     console.log('=== chatData 생성 후 ===');
@@ -37,7 +50,7 @@ export async function getChatResponse(messageText, history) {
     try {
         // 첫 번째 API 호출 - 챗봇 응답 받기
         console.log('=== 첫 번째 API 호출 시작 ===');
-        const response = await fetch('/request/rag_model/lcel', {
+        const response = await fetch('/request/rag_model/lcel/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -53,7 +66,20 @@ export async function getChatResponse(messageText, history) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const chatResponse = await response.text();
+        // 스트리밍 응답 읽기 - 토큰이 도착할 때마다 onToken 호출
+        let chatResponse = '';
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder('utf-8');
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            chatResponse += decoder.decode(value, { stream: true });
+            if (onToken) onToken(chatResponse);
+        }
+        chatResponse += decoder.decode();
+
         console.log('=== 챗봇 응답 받음 ===');
         console.log('Chat response:', chatResponse);
 
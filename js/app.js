@@ -114,13 +114,25 @@ const sendMessage = () => {
     console.log('API 호출 전 현재 히스토리:', chatHistory);
     console.log('히스토리 길이:', chatHistory.length);
 
-    getChatResponse(messageText, chatHistory)  // 여기가 핵심 수정!
+    // 스트리밍 중인 봇 메시지 (첫 토큰 수신 시 생성)
+    let streamingMessage = null;
+
+    const handleToken = (partialResponse) => {
+        if (!streamingMessage) {
+            hideTypingIndicator();
+            streamingMessage = createBotMessage();
+        }
+        streamingMessage.messageBubble.textContent = partialResponse;
+        chatMessages.scrollTop = chatMessages.scrollHeight;
+    };
+
+    getChatResponse(messageText, chatHistory, handleToken)  // 여기가 핵심 수정!
         .then(fullResponse => {
             console.log('받은 응답:', fullResponse);
             console.log('응답 타입:', typeof fullResponse);
             hideTypingIndicator();
 
-            const { messageBubble, messageWrapper } = createBotMessage();
+            const { messageBubble, messageWrapper } = streamingMessage || createBotMessage();
 
             // 백엔드에서 문자열 "\n"을 보내는 경우 실제 줄바꿈으로 변환
             let finalMarkdown = fullResponse.replace(/\\n/g, '\n');
@@ -228,7 +240,7 @@ const sendMessage = () => {
         .catch(error => {
             hideTypingIndicator();
 
-            const { messageBubble, messageWrapper } = createBotMessage();
+            const { messageBubble, messageWrapper } = streamingMessage || createBotMessage();
             const timestamp = document.createElement('span');
             timestamp.classList.add('timestamp');
             timestamp.textContent = getCurrentTime();
@@ -1,76 +1,335 @@
-import ollama, os
+import ollama, os, random, time
+import ast, csv, hashlib, json, re, sqlite3
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Union
 from langchain_community.document_loaders import TextLoader
 from langchain_core.documents import Document
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Set Gemini API KEY
-genai.configure(api_key = os.getenv('GEMINI_API_KEY'))
+def request_gem(text: str, prompt: str, model: str = 'gemini-2.5-flash', temperature: float = 0.5, max_tokens: int = 2048) -> str:
+    """ Get Reponse from Gemini (공유 client: 모델 설정 캐시, 동시성 / RPM 제한, 429 재시도) """
+    from app.services.gemini import get_gemini_client
 
-def request_gem(text: str, prompt: str, model: str = 'gemini-2.5-flash') -> str:
-    """ Get Reponse from Gemini """
-    client = genai.GenerativeModel(model)
+    return get_gemini_client().generate(f'{prompt}\n\n요청사항: {text}', model = model, temperature = temperature, max_tokens = max_tokens)
 
-    contents = [
-        {
-            'role': 'user',
-            'parts': [f'{prompt}\n\n요청사항: {text}']
-        }
-    ]
+SA_SYSTEM_PROMPT = """
+1. 텍스트 감성분석 전문가야.
+2. 주식 뉴스 기사 감성분석을 수행해줘.
+3. 답변은 반드시 아래 JSON 형식만 출력해. positive + negative = 1.0
+{"positive": 0.6, "negative": 0.4}
+"""
 
-    response = client.generate_content(
-        contents = contents
-    )
+# Ollama structured output: 응답을 JSON schema로 강제
+SA_FORMAT = {
+    'type': 'object',
+    'properties': {
+        'positive': {'type': 'number'},
+        'negative': {'type': 'number'}
+    },
+    'required': ['positive', 'negative']
+}
 
-    return response.text
-
-def request_sa(text: str, model: str = 'gpt-oss:20b') -> str:
-    """ Get Reponse sentimental-analysis """
-    response = ollama.chat(
-        model = 'gpt-oss:20b',
-        messages =[
-            {
-                'role': 'system',
-                'content': """
-                1. 텍스트 감성분석 전문가야.
-                2. 주식 뉴스 기사 감성분석을 수행해줘.
-                3. 답변의 자유도는 절대 아래의 예시폼에서 벗어나서는 안 돼
-                ```json{'positive': 0.6, 'negative': 0.4}```
-                4. 답변을 주기 전에 네 답변을 한 번 더 검증 후 답변해줘.
-                """
-            },
-            {
-                'role': 'user',
-                'content': text
-            }
-        ]
+def request_sa(text: str, model: str = 'gpt-oss:20b', client: Optional[ollama.Client] = None) -> str:
+    """ Get Reponse sentimental-analysis (JSON string) """
+    response = (client or ollama).chat(
+        model = model,
+        messages = [
+            {'role': 'system', 'content': SA_SYSTEM_PROMPT},
+            {'role': 'user', 'content': text}
+        ],
+        format = SA_FORMAT,
+        options = {'temperature': 0}
     )
     return response['message']['content']
 
+def parse_sentiment(content: str, tolerance: float = 0.05) -> Optional[dict]:
+    """
+    감성분석 응답 -> {'positive': float, 'negative': float}
+    - JSON (```json 코드블록, 작은따옴표 형식 포함) 파싱
+    - 두 값 모두 0 ~ 1, 합계가 1 ± tolerance 인 경우만 유효 (합계 1로 정규화)
+    - 유효하지 않으면 None
+    """
+    match = re.search(r'\{.*?\}', content or '', re.S)
+    if match is None:
+        return None
+
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        try:
+            data = ast.literal_eval(match.group(0))
+        except (ValueError, SyntaxError):
+            return None
+
+    try:
+        positive, negative = float(data['positive']), float(data['negative'])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+    if not (0.0 <= positive <= 1.0 and 0.0 <= negative <= 1.0):
+        return None
+
+    total = positive + negative
+    if abs(total - 1.0) > tolerance:
+        return None
+
+    return {'positive': round(positive / total, 4), 'negative': round(negative / total, 4)}
+
+def article_hash(text: str, model: str) -> str:
+    """ 감성분석 캐시 키: 모델 + 프롬프트 + 기사 본문 """
+    return hashlib.sha256(f'{model}\x00{SA_SYSTEM_PROMPT}\x00{text}'.encode('utf-8')).hexdigest()
+
+def iter_articles(path: str, text_col: str = 'content') -> Iterator[dict]:
+    """ JSONL / CSV 기사 파일을 한 줄씩 읽기 (전체를 메모리에 올리지 않음) """
+    with open(path, 'r', encoding = 'utf-8', newline = '') as f:
+        if path.endswith('.csv'):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for row in rows:
+            if row.get(text_col):
+                yield row
+
+class SentimentCache:
+    """ article_hash -> 감성분석 결과 (SQLite, 재실행 시 이미 분석한 기사는 건너뜀) """
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok = True)
+        self.conn = sqlite3.connect(path, check_same_thread = False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS sentiment (key TEXT PRIMARY KEY, positive REAL, negative REAL)')
+
+    def get(self, key: str) -> Optional[dict]:
+        row = self.conn.execute('SELECT positive, negative FROM sentiment WHERE key = ?', (key,)).fetchone()
+        return {'positive': row[0], 'negative': row[1]} if row else None
+
+    def put(self, key: str, result: dict):
+        self.conn.execute('INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?)', (key, result['positive'], result['negative']))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def _sa_request(client: ollama.Client, text: str, model: str, max_retries: int, backoff: float) -> Optional[dict]:
+    """ request_sa 1회 + 파싱, 연결 오류 / 5xx / 429 및 파싱 실패 시 재시도 """
+    for attempt in range(max_retries + 1):
+        try:
+            result = parse_sentiment(request_sa(text, model = model, client = client))
+            if result is not None or attempt == max_retries:
+                return result
+
+        except ollama.ResponseError as e:
+            if attempt == max_retries or (400 <= e.status_code < 500 and e.status_code != 429):
+                raise
+
+        except (ConnectionError, OSError):
+            if attempt == max_retries:
+                raise
+
+        time.sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+
+def sentiment_batch(
+    input_path: str,
+    output_path: str,
+    model: str = 'gpt-oss:20b',
+    text_col: str = 'content',
+    max_concurrency: int = 4,
+    max_retries: int = 2,
+    backoff: float = 0.5,
+    cache_path: Optional[str] = 'model_cache/sentiment.sqlite',
+    host: Optional[str] = None
+) -> dict:
+    """
+    Streaming Sentiment Batch
+    - 기사 파일(JSONL / CSV)을 스트리밍으로 읽어 최대 max_concurrency 개 요청 동시 실행
+    - 결과는 입력 순서대로 output_path(JSONL)에 즉시 기록 (원본 row + positive / negative)
+    - 파싱 실패 기사는 positive / negative = None 으로 기록, 캐시에는 저장하지 않음
+    - 처리량 / 파싱 실패율 반환
+    """
+    client = ollama.Client(host = host)
+    cache = SentimentCache(cache_path) if cache_path else None
+    report = {'articles': 0, 'cached': 0, 'requested': 0, 'parse_failures': 0, 'errors': 0}
+    started = time.perf_counter()
+
+    def write(f, row: dict, result: Optional[dict]):
+        row.update(result or {'positive': None, 'negative': None})
+        f.write(json.dumps(row, ensure_ascii = False) + '\n')
+
+    with ThreadPoolExecutor(max_workers = max_concurrency) as executor, open(output_path, 'w', encoding = 'utf-8') as f:
+        in_flight = deque()
+
+        def drain_one():
+            row, key, future = in_flight.popleft()
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[Sentiment] request error: {e}")
+                report['errors'] += 1
+                result = None
+            else:
+                if result is None:
+                    report['parse_failures'] += 1
+                elif cache is not None and key is not None:
+                    cache.put(key, result)
+            write(f, row, result)
+
+        for row in iter_articles(input_path, text_col = text_col):
+            report['articles'] += 1
+            key = article_hash(row[text_col], model)
+
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                report['cached'] += 1
+                # 입력 순서 유지: 앞선 요청이 끝난 뒤 기록
+                done = Future()
+                done.set_result(cached)
+                in_flight.append((row, None, done))
+            else:
+                report['requested'] += 1
+                in_flight.append((row, key, executor.submit(_sa_request, client, row[text_col], model, max_retries, backoff)))
+
+            # 입력 파일을 너무 앞서 읽지 않도록 대기 중인 요청 수 제한
+            while len(in_flight) >= max_concurrency * 2:
+                drain_one()
+
+            if report['articles'] % 1000 == 0:
+                f.flush()
+                if cache is not None:
+                    cache.commit()
+
+        while in_flight:
+            drain_one()
+
+    if cache is not None:
+        cache.close()
+
+    elapsed = time.perf_counter() - started
+    report['elapsed'] = round(elapsed, 3)
+    report['articles_per_sec'] = round(report['articles'] / elapsed, 2) if elapsed else 0.0
+    report['parse_failure_rate'] = round(report['parse_failures'] / report['requested'], 4) if report['requested'] else 0.0
+
+    return report
+
 def text_embedding(text, model: str = 'bge-m3') -> list:
     """ Single Text embedding for RAG """
     response = ollama.embeddings(
-        model = 'bge-m3',   # 모델명
+        model = model,      # 모델명
         prompt = text       # 임베딩 텍스트
     )
     
     return response['embedding']
 
-def texts_embedding(text_data, model: str = 'bge-m3'):
-    """ Multi Text iterrable data embedding for RAG """
-    # input type : Document Object
-    if isinstance(text_data[0], Document):
-        embedding_results = []
-        for i in range(len(text_data)):
-            embedding_results.append(text_embedding(text_data[i].page_content))
-        return embedding_results
-    
-    # input type : str List
-    elif isinstance(text_data[0], str):
-        responses = [text_embedding(text, model) for text in text_data]
-        return responses
+def _iter_text_batches(text_data: Iterable[Union[str, Document]], batch_size: int) -> Iterator[List[str]]:
+    """ str / Document iterable(generator 포함) -> batch_size 단위 str list """
+    batch = []
+
+    for text in text_data:
+        batch.append(text.page_content if isinstance(text, Document) else text)
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+def _embed_batch(client: ollama.Client, texts: List[str], model: str, max_retries: int, backoff: float) -> np.ndarray:
+    """ Ollama batch 'embed' API 1회 호출 (429 / 5xx / 연결 오류 시 지수 backoff 재시도) """
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.embed(model = model, input = texts)
+            return np.asarray(response['embeddings'], dtype = np.float32)
+
+        except ollama.ResponseError as e:
+            # 4xx (429 제외)는 재시도해도 실패
+            if attempt == max_retries or (400 <= e.status_code < 500 and e.status_code != 429):
+                raise
+
+        except (ConnectionError, OSError):
+            if attempt == max_retries:
+                raise
+
+        time.sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+
+def iter_embeddings(
+    text_data: Iterable[Union[str, Document]],
+    model: str = 'bge-m3',
+    batch_size: int = 64,
+    max_concurrency: int = 4,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+    host: Optional[str] = None
+) -> Iterator[np.ndarray]:
+    """
+    Batch Embedding Engine (streaming)
+    - batch_size 개씩 묶어 Ollama 'embed' API 호출, 최대 max_concurrency 개 요청 동시 실행
+    - 입력 순서대로 batch 단위 float32 matrix 반환 -> 대용량 corpus도 메모리 일정
+    """
+    client = ollama.Client(host = host)
+
+    with ThreadPoolExecutor(max_workers = max_concurrency) as executor:
+        in_flight = deque()
+
+        for batch in _iter_text_batches(text_data, batch_size):
+            in_flight.append(executor.submit(_embed_batch, client, batch, model, max_retries, backoff))
+
+            # 입력 generator를 너무 앞서 읽지 않도록 대기 중인 batch 수 제한
+            if len(in_flight) >= max_concurrency * 2:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def texts_embedding(text_data, model: str = 'bge-m3', batch_size: int = 64, max_concurrency: int = 4, host: Optional[str] = None, cache_dir: Optional[str] = None) -> np.ndarray:
+    """
+    Multi Text iterrable data embedding for RAG -> float32 matrix (N, dim)
+    - cache_dir 지정 시 디스크 캐시(EmbeddingStore)에 없는 텍스트만 Ollama로 임베딩
+    """
+    # input type : Document Object / str (list or generator)
+    if cache_dir is not None:
+        return _cached_texts_embedding(text_data, model, batch_size, max_concurrency, host, cache_dir)
+
+    matrices = list(iter_embeddings(text_data, model = model, batch_size = batch_size, max_concurrency = max_concurrency, host = host))
+
+    if not matrices:
+        return np.empty((0, 0), dtype = np.float32)
+
+    return np.vstack(matrices)
+
+def _cached_texts_embedding(text_data, model: str, batch_size: int, max_concurrency: int, host: Optional[str], cache_dir: str) -> np.ndarray:
+    """ batch 단위로 캐시 조회 -> 없는 텍스트만 임베딩 후 저장 """
+    from app.services.embedding_cache import EmbeddingStore, cache_key
+
+    store = EmbeddingStore(cache_dir)
+    matrices = []
+
+    try:
+        for texts in _iter_text_batches(text_data, batch_size * max_concurrency):
+            keys = [cache_key(f'ollama/{model}', False, 'document', text) for text in texts]
+            found = store.get_many(keys)
+
+            missing = {key: text for key, text in zip(keys, texts) if key not in found}
+            if missing:
+                vectors = np.vstack(list(iter_embeddings(missing.values(), model = model, batch_size = batch_size, max_concurrency = max_concurrency, host = host)))
+                computed = dict(zip(missing.keys(), vectors))
+                store.put_many(computed)
+                found.update(computed)
+
+            matrices.append(np.vstack([found[key] for key in keys]))
+    finally:
+        store.close()
+
+    if not matrices:
+        return np.empty((0, 0), dtype = np.float32)
+
+    return np.vstack(matrices)
     
 def load_parent_directory():
     """ load the parent directory to access libraries """
@@ -85,4 +344,27 @@ def load_parent_directory():
         current_dir = os.path.dirname(os.path.abspath(__file__))
         parent_dir = os.path.dirname(current_dir)
         sys.path.append(parent_dir)
-        return print("Success: '*.py'")
\ No newline at end of file
+        return print("Success: '*.py'")
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description = 'Streaming sentiment analysis over a JSONL / CSV news dump')
+    parser.add_argument('input_path')
+    parser.add_argument('output_path')
+    parser.add_argument('--model', default = 'gpt-oss:20b')
+    parser.add_argument('--text-col', default = 'content')
+    parser.add_argument('--concurrency', type = int, default = 4)
+    parser.add_argument('--cache-path', default = 'model_cache/sentiment.sqlite')
+    parser.add_argument('--host', default = None)
+    args = parser.parse_args()
+
+    print(sentiment_batch(
+        args.input_path,
+        args.output_path,
+        model = args.model,
+        text_col = args.text_col,
+        max_concurrency = args.concurrency,
+        cache_path = args.cache_path,
+        host = args.host
+    ))